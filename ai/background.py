@@ -0,0 +1,300 @@
+# ai/background.py
+
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from state.system_state import SystemState
+from state.history_store import DEMAND
+from simulation.engine import draw_demand
+from ai.forecasting import (
+    FIT_FAILED,
+    ForecastJob,
+    ForecastOutcome,
+    run_forecast_job,
+    rolling_mean_forecast,
+    apply_forecast_outcome,
+)
+from ai.model_pool import terminate_pool, warm_pool
+from monitoring.instrumentation import Instrumentation
+
+
+TIMED_OUT = "Rolling Mean (ARIMA + GARCH timed out)"
+
+
+class BackgroundForecaster:
+    """
+    Runs model fits on a background process pool, ahead of time.
+
+    Tomorrow's demand does not depend on anything the operator does
+    today, so right after a cycle finishes prepare_next_day() draws it
+    from state.rng (exactly the draw advance_one_day would make) and
+    submits tomorrow's fits. They run while today's recommendations
+    are being reviewed. On the next cycle advance_one_day consumes the
+    pre-drawn demand and collect() picks up the finished fits.
+
+    Each fit gets `fit_budget` seconds, counted in its worker from the
+    moment it starts, so fits queued behind others are not charged for
+    the wait. A fit that overruns or fails falls back to the rolling
+    mean for that day, and DemandForecast.model_used records it. The
+    pool is only replaced when a worker dies, or when no fit finishes
+    for `stuck_after` seconds (a fit stuck where the budget cannot
+    interrupt it).
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        fit_budget: float = 5.0,
+        horizon: int = 7,
+        window: int = 30,
+        warmup: int = 20,
+        incremental: bool = False,
+        refit_every: int = 7,
+        drift_threshold: float = 3.0,
+        prewarm: bool = False,
+        stuck_after: float = 30.0,
+    ) -> None:
+        self.workers = workers
+        self.fit_budget = fit_budget
+        self.stuck_after = stuck_after
+        self.horizon = horizon
+        self.window = window
+        self.warmup = warmup
+        self.incremental = incremental
+        self.refit_every = refit_every
+        self.drift_threshold = drift_threshold
+
+        # Workers load the model libraries as they start; with
+        # prewarm=False that happens on the first submit
+        self._pool = warm_pool(workers, prewarm=prewarm)
+
+        self._prepared_day: Optional[int] = None
+        self._product_ids: List[str] = []
+        self._demand: Optional[np.ndarray] = None
+        self._jobs: List[ForecastJob] = []
+        self._futures: Dict[int, Future] = {}
+
+    # --------------------------------------------------
+    # Scheduling
+    # --------------------------------------------------
+    def prepare_next_day(self, state: SystemState) -> None:
+        """
+        Draws tomorrow's demand and starts tomorrow's fits.
+        """
+
+        self._discard()
+
+        day = state.day + 1
+        self._product_ids = list(state.products)
+        self._demand = draw_demand(state, day)
+        self._prepared_day = day
+
+        for product_id, units in zip(self._product_ids, self._demand):
+            recent = state.history.tail(
+                DEMAND,
+                product_id,
+                self.window - 1,
+            ).tolist()
+            recent.append(int(units))
+            self._jobs.append(self._job(state, product_id, recent, day))
+
+        self._submit()
+
+    def take_demand(self, state: SystemState) -> Optional[np.ndarray]:
+        """
+        The pre-drawn demand for the day about to be simulated, or
+        None if nothing valid was prepared.
+        """
+        if not self._is_prepared_for(state, state.day + 1):
+            self._discard()
+            return None
+        return self._demand
+
+    def _is_prepared_for(self, state: SystemState, day: int) -> bool:
+        return (
+            self._prepared_day == day
+            and self._product_ids == list(state.products)
+        )
+
+    def _job(
+        self,
+        state: SystemState,
+        product_id: str,
+        recent: List[int],
+        day: int,
+    ) -> ForecastJob:
+        return ForecastJob(
+            product_id=product_id,
+            recent_demand=recent,
+            horizon=self.horizon,
+            warmup=self.warmup,
+            day=day,
+            incremental=self.incremental,
+            previous=state.fitted_models.get(product_id),
+            refit_every=self.refit_every,
+            drift_threshold=self.drift_threshold,
+        )
+
+    def _submit(self) -> None:
+        for i, job in enumerate(self._jobs):
+            if len(job.recent_demand) >= job.warmup:
+                self._futures[i] = self._pool.submit(
+                    run_budgeted_job,
+                    job,
+                    self.fit_budget,
+                )
+
+    def _discard(self) -> None:
+        for future in self._futures.values():
+            future.cancel()
+        self._prepared_day = None
+        self._product_ids = []
+        self._demand = None
+        self._jobs = []
+        self._futures = {}
+
+    # --------------------------------------------------
+    # Collection
+    # --------------------------------------------------
+    def update_forecasts(
+        self,
+        state: SystemState,
+        instruments: Optional[Instrumentation] = None,
+    ) -> None:
+        """
+        Drop-in for ai.forecasting.update_forecasts: applies the
+        prepared fits for today, or submits and waits for them now if
+        nothing was prepared (e.g. on the first day).
+        """
+
+        if not self._is_prepared_for(state, state.day):
+            self._discard()
+            self._product_ids = list(state.products)
+            self._prepared_day = state.day
+            self._jobs = [
+                self._job(
+                    state,
+                    product_id,
+                    state.history.tail(
+                        DEMAND,
+                        product_id,
+                        self.window,
+                    ).tolist(),
+                    state.day,
+                )
+                for product_id in self._product_ids
+            ]
+            self._submit()
+
+        outcomes = self._collect()
+        self._discard()
+
+        for outcome in outcomes:
+            apply_forecast_outcome(state, outcome, self.horizon)
+
+        if instruments is not None:
+            instruments.record_forecasts(outcomes)
+
+    def _collect(self) -> List[ForecastOutcome]:
+        """
+        Waits for the outstanding fits; each enforces its own budget.
+        If no fit finishes for stuck_after seconds, the ones still
+        outstanding fall back to the rolling mean and the pool is
+        replaced. Fits whose worker or job raised fall back as well.
+        """
+
+        start = time.perf_counter()
+        pending = set(self._futures.values())
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=self.stuck_after,
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                break
+        elapsed = time.perf_counter() - start
+
+        outcomes = []
+        replace_pool = bool(pending)
+
+        for i, job in enumerate(self._jobs):
+            future = self._futures.get(i)
+
+            if future is None:
+                outcomes.append(run_forecast_job(job))
+            elif future in pending:
+                outcomes.append(_fallback(job, TIMED_OUT, elapsed))
+            elif future.exception() is not None:
+                # Includes BrokenProcessPool when a worker died
+                replace_pool = True
+                outcomes.append(_fallback(job, FIT_FAILED, elapsed))
+            else:
+                outcomes.append(future.result())
+
+        # Stuck or dead workers are killed, not left to wind down
+        if replace_pool:
+            terminate_pool(self._pool)
+            self._pool = warm_pool(self.workers, prewarm=True)
+
+        return outcomes
+
+    def close(self) -> None:
+        self._discard()
+        terminate_pool(self._pool)
+
+
+class _FitTimeout(BaseException):
+    """
+    Raised in a worker when its fit overruns the budget. Not an
+    Exception, so the fit's own error handling does not swallow it.
+    """
+
+
+def _on_alarm(signum, frame) -> None:
+    raise _FitTimeout()
+
+
+def run_budgeted_job(job: ForecastJob, budget: float) -> ForecastOutcome:
+    """
+    run_forecast_job with at most `budget` seconds of wall time from
+    the start of the fit. Runs in a pool worker's main thread; where
+    the platform has no interval timer the fit runs unbounded.
+    """
+
+    if not hasattr(signal, "setitimer"):
+        return run_forecast_job(job)
+
+    start = time.perf_counter()
+    previous = signal.signal(signal.SIGALRM, _on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, budget)
+    try:
+        return run_forecast_job(job)
+    except _FitTimeout:
+        return _fallback(job, TIMED_OUT, time.perf_counter() - start)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _fallback(
+    job: ForecastJob,
+    model_used: str,
+    seconds: float,
+) -> ForecastOutcome:
+    return ForecastOutcome(
+        product_id=job.product_id,
+        forecast_values=rolling_mean_forecast(
+            job.recent_demand,
+            job.horizon,
+        ),
+        bands=None,
+        model_used=model_used,
+        fitted=job.previous,
+        fit_seconds=seconds,
+        fit_failed=True,
+    )
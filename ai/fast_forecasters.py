@@ -0,0 +1,238 @@
+# ai/fast_forecasters.py
+"""
+Cheap forecasters evaluated for many products at once.
+
+Every model takes a (n_products, window) demand matrix, runs its
+smoothing recursion with one vectorized step per time index, and
+returns one-step-ahead in-sample predictions (for backtesting) and
+the `horizon`-step forecast. select_models then picks, per product,
+the model with the lowest recent backtest error, and flags series that
+no cheap model fits well enough so they can go to ARIMA + GARCH.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+SEASON = 7
+
+SES_ALPHA = 0.3
+HOLT_ALPHA = 0.3
+HOLT_BETA = 0.1
+SEASONAL_ALPHA = 0.2
+SEASONAL_GAMMA = 0.1
+CROSTON_ALPHA = 0.1
+
+# Model names as they appear in DemandForecast.model_used
+SES = "Simple Exp. Smoothing"
+HOLT = "Holt"
+SEASONAL = "Seasonal Exp. Smoothing"
+CROSTON = "Croston"
+
+MODELS = (SES, HOLT, SEASONAL, CROSTON)
+
+
+# ======================================================
+# Models
+# ======================================================
+
+def simple_exponential_smoothing(
+    Y: np.ndarray,
+    horizon: int,
+    alpha: float = SES_ALPHA,
+) -> Tuple[np.ndarray, np.ndarray]:
+
+    n, T = Y.shape
+    pred = np.full((n, T), np.nan)
+
+    level = Y[:, 0].astype(float)
+    for t in range(1, T):
+        pred[:, t] = level
+        level = alpha * Y[:, t] + (1 - alpha) * level
+
+    return pred, np.repeat(level[:, None], horizon, axis=1)
+
+
+def holt(
+    Y: np.ndarray,
+    horizon: int,
+    alpha: float = HOLT_ALPHA,
+    beta: float = HOLT_BETA,
+) -> Tuple[np.ndarray, np.ndarray]:
+
+    n, T = Y.shape
+    pred = np.full((n, T), np.nan)
+
+    level = Y[:, 0].astype(float)
+    trend = (Y[:, 1] - Y[:, 0]).astype(float) if T > 1 else np.zeros(n)
+
+    for t in range(1, T):
+        pred[:, t] = level + trend
+        new_level = alpha * Y[:, t] + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        level = new_level
+
+    steps = np.arange(1, horizon + 1)
+    return pred, level[:, None] + trend[:, None] * steps[None, :]
+
+
+def seasonal_exponential_smoothing(
+    Y: np.ndarray,
+    horizon: int,
+    alpha: float = SEASONAL_ALPHA,
+    gamma: float = SEASONAL_GAMMA,
+    period: int = SEASON,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Additive-seasonal smoothing (no trend). Needs two full seasons;
+    shorter windows get NaN predictions and are never selected.
+    """
+
+    n, T = Y.shape
+    pred = np.full((n, T), np.nan)
+
+    if T < 2 * period:
+        return pred, np.full((n, horizon), np.nan)
+
+    level = Y[:, :period].mean(axis=1)
+    season = Y[:, :period] - level[:, None]
+
+    for t in range(period, T):
+        s = t % period
+        pred[:, t] = level + season[:, s]
+        new_level = alpha * (Y[:, t] - season[:, s]) + (1 - alpha) * level
+        season[:, s] = gamma * (Y[:, t] - new_level) + (1 - gamma) * season[:, s]
+        level = new_level
+
+    idx = (T + np.arange(horizon)) % period
+    return pred, level[:, None] + season[:, idx]
+
+
+def croston(
+    Y: np.ndarray,
+    horizon: int,
+    alpha: float = CROSTON_ALPHA,
+    init: int = SEASON,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Croston's method for intermittent demand: smooths non-zero demand
+    sizes and the intervals between them separately. Initialized from
+    the first `init` observations.
+    """
+
+    n, T = Y.shape
+    pred = np.full((n, T), np.nan)
+    init = min(init, T)
+
+    head = Y[:, :init]
+    nonzero = (head > 0).sum(axis=1)
+    size = np.where(
+        nonzero > 0,
+        head.sum(axis=1) / np.maximum(nonzero, 1),
+        0.0,
+    )
+    interval = np.where(nonzero > 0, init / np.maximum(nonzero, 1), 1.0)
+    since = np.ones(n)
+
+    for t in range(init, T):
+        pred[:, t] = size / interval
+        demand = Y[:, t]
+        hit = demand > 0
+        size = np.where(hit, alpha * demand + (1 - alpha) * size, size)
+        interval = np.where(
+            hit, alpha * since + (1 - alpha) * interval, interval
+        )
+        since = np.where(hit, 1.0, since + 1.0)
+
+    return pred, np.repeat((size / interval)[:, None], horizon, axis=1)
+
+
+_MODEL_FUNCS = {
+    SES: simple_exponential_smoothing,
+    HOLT: holt,
+    SEASONAL: seasonal_exponential_smoothing,
+    CROSTON: croston,
+}
+
+
+# ======================================================
+# Model selection
+# ======================================================
+
+@dataclass
+class TierSelection:
+    """
+    Per-product choice among the cheap models, as aligned arrays.
+    """
+    model: np.ndarray           # model name per product
+    forecast: np.ndarray        # (n, horizon), clipped at 0
+    sigma: np.ndarray           # one-step backtest error std
+    relative_error: np.ndarray  # backtest MAE / mean demand
+    needs_arima: np.ndarray     # no cheap model is good enough
+
+
+def select_models(
+    Y: np.ndarray,
+    horizon: int,
+    backtest: int = SEASON,
+    arima_threshold: float = 0.35,
+) -> TierSelection:
+    """
+    Fits every cheap model to all rows of Y and keeps, per row, the
+    one with the lowest MAE over the last `backtest` one-step-ahead
+    predictions. Rows whose best MAE exceeds arima_threshold times
+    their mean demand are flagged for ARIMA + GARCH.
+    """
+
+    Y = np.asarray(Y, dtype=float)
+    n = Y.shape[0]
+
+    maes = np.empty((len(MODELS), n))
+    stds = np.empty((len(MODELS), n))
+    forecasts = np.empty((len(MODELS), n, horizon))
+
+    for m, name in enumerate(MODELS):
+        pred, fc = _MODEL_FUNCS[name](Y, horizon)
+        errors = Y[:, -backtest:] - pred[:, -backtest:]
+        with np.errstate(invalid="ignore"):
+            maes[m] = np.abs(errors).mean(axis=1)
+            stds[m] = errors.std(axis=1)
+        forecasts[m] = fc
+
+    # Models that could not produce a backtest never win
+    maes = np.where(np.isnan(maes), np.inf, maes)
+
+    best = maes.argmin(axis=0)
+    rows = np.arange(n)
+    best_mae = maes[best, rows]
+
+    scale = Y.mean(axis=1)
+    relative = np.divide(
+        best_mae,
+        scale,
+        out=np.where(best_mae > 0, np.inf, 0.0),
+        where=scale > 0,
+    )
+
+    return TierSelection(
+        model=np.array(MODELS, dtype=object)[best],
+        forecast=np.maximum(forecasts[best, rows], 0.0),
+        sigma=stds[best, rows],
+        relative_error=relative,
+        needs_arima=relative > arima_threshold,
+    )
+
+
+def tier_bands(
+    forecast: np.ndarray,
+    sigma: float,
+) -> Dict[str, list]:
+    """
+    ±1 sigma bands, the same width convention as the ARIMA + GARCH path.
+    """
+    return {
+        "lower": np.maximum(forecast - sigma, 0.0).tolist(),
+        "upper": (forecast + sigma).tolist(),
+    }
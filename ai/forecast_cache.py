@@ -0,0 +1,108 @@
+# ai/forecast_cache.py
+
+import hashlib
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+# (forecast_values, confidence_bands, model_used)
+CachedForecast = Tuple[list, Optional[dict], str]
+
+
+class ForecastCache:
+    """
+    Content-addressed cache of model forecasts with LRU eviction.
+
+    Entries are keyed by a hash of the demand window, the horizon and
+    the model configuration, so identical inputs (re-forecasts on the
+    same day, UI reruns, many SKUs with the same series) are looked up
+    instead of refitted.
+    """
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedForecast]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(
+        recent_demand: Sequence[float],
+        horizon: int,
+        model_config: str,
+    ) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.asarray(recent_demand, dtype=np.float64).tobytes())
+        digest.update(f"|{horizon}|{model_config}".encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[CachedForecast]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, value: CachedForecast) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    # --------------------------------------------------
+    # Persistence
+    # --------------------------------------------------
+    def save(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as fh:
+            pickle.dump(
+                (self.max_entries, list(self._entries.items())),
+                fh,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        tmp.replace(path)
+
+    @classmethod
+    def load(
+        cls,
+        path: Union[str, Path],
+        max_entries: Optional[int] = None,
+    ) -> "ForecastCache":
+        """
+        Restores a saved cache; a missing file gives an empty cache.
+        """
+        path = Path(path)
+        if not path.exists():
+            return cls(max_entries or 10_000)
+
+        with open(path, "rb") as fh:
+            saved_max, items = pickle.load(fh)
+
+        cache = cls(max_entries or saved_max)
+        for key, value in items:
+            cache.put(key, value)
+        cache.evictions = 0
+        return cache
@@ -1,17 +1,30 @@
 # ai/forecasting.py
 
-from typing import List, Dict
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 import numpy as np
 
 from state.system_state import (
     SystemState,
     DemandRecord,
     DemandForecast,
-    DailyForecastRecord,
+    FittedModelState,
 )
+from state.history_store import HistoryView, DEMAND, FORECAST
+from ai.forecast_cache import ForecastCache
+from ai.fast_forecasters import select_models, tier_bands
+from monitoring.instrumentation import Instrumentation
 
-from statsmodels.tsa.arima.model import ARIMA
-from arch import arch_model
+
+ROLLING_MEAN = "Rolling Mean"
+ARIMA_GARCH = "ARIMA + GARCH"
+FIT_FAILED = "Rolling Mean (ARIMA + GARCH failed)"
+
+# Part of every forecast cache key; change it when the model changes
+MODEL_CONFIG = "ARIMA(1,1,1)+GARCH(1,1)"
 
 
 # ======================================================
@@ -25,7 +38,13 @@ def extract_recent_demand(
 ) -> List[int]:
     """
     Extract TRUE realized demand (never clipped by stockouts).
+
+    A HistoryView is answered from its columnar store in O(window);
+    a plain list of records is scanned in full.
     """
+    if isinstance(demand_history, HistoryView):
+        return demand_history.tail(product_id, window).tolist()
+
     return [
         r.demand
         for r in demand_history
@@ -47,13 +66,43 @@ def rolling_mean_forecast(
 # ARIMA + GARCH
 # ======================================================
 
-def arima_garch_forecast(
+@lru_cache(maxsize=None)
+def load_model_libraries():
+    """
+    statsmodels' ARIMA and arch's arch_model, imported on first use.
+    Importing them takes longer than most simulated days, and runs
+    that never leave the rolling-mean warmup don't need them at all.
+    """
+    from statsmodels.tsa.arima.model import ARIMA
+    from arch import arch_model
+
+    return ARIMA, arch_model
+
+
+def _fit_arima_garch(
     recent_demand: List[int],
     horizon: int,
-) -> Dict[str, List[float]]:
+    previous: Optional[FittedModelState] = None,
+    reoptimize: bool = True,
+) -> Tuple[Dict[str, List[float]], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Fits (or, with reoptimize=False, re-filters) ARIMA(1,1,1) and a
+    GARCH(1,1) on its residuals.
+
+    When `previous` is given its parameters are used as optimizer
+    start values, or applied unchanged if reoptimize is False.
+    """
+
+    ARIMA, arch_model = load_model_libraries()
 
     arima = ARIMA(recent_demand, order=(1, 1, 1))
-    arima_fit = arima.fit()
+
+    if previous is None:
+        arima_fit = arima.fit()
+    elif reoptimize:
+        arima_fit = arima.fit(start_params=previous.arima_params)
+    else:
+        arima_fit = arima.filter(previous.arima_params)
 
     mean_forecast = arima_fit.forecast(steps=horizon)
 
@@ -66,7 +115,16 @@ def arima_garch_forecast(
         q=1,
         dist="normal",
     )
-    garch_fit = garch.fit(disp="off")
+
+    if previous is None:
+        garch_fit = garch.fit(disp="off")
+    elif reoptimize:
+        garch_fit = garch.fit(
+            disp="off",
+            starting_values=np.asarray(previous.garch_params),
+        )
+    else:
+        garch_fit = garch.fix(previous.garch_params)
 
     variance = garch_fit.forecast(horizon=horizon)
     sigma = np.sqrt(variance.variance.values[-1])
@@ -74,12 +132,205 @@ def arima_garch_forecast(
     lower = np.maximum(mean_forecast - sigma, 0.0)
     upper = mean_forecast + sigma
 
-    return {
+    result = {
         "mean": mean_forecast.tolist(),
         "lower": lower.tolist(),
         "upper": upper.tolist(),
     }
 
+    return (
+        result,
+        residuals,
+        np.asarray(arima_fit.params),
+        np.asarray(garch_fit.params),
+    )
+
+
+def arima_garch_forecast(
+    recent_demand: List[int],
+    horizon: int,
+) -> Dict[str, List[float]]:
+
+    result, _, _, _ = _fit_arima_garch(recent_demand, horizon)
+    return result
+
+
+def incremental_arima_garch_forecast(
+    recent_demand: List[int],
+    horizon: int,
+    previous: Optional[FittedModelState],
+    day: int,
+    refit_every: int = 7,
+    drift_threshold: float = 3.0,
+) -> Tuple[Dict[str, List[float]], FittedModelState]:
+    """
+    ARIMA + GARCH that reuses yesterday's parameters.
+
+    Between full refits the stored parameters are applied to the new
+    window without re-optimizing. A warm-started refit happens every
+    `refit_every` days, or as soon as the newest residual exceeds
+    `drift_threshold` times the residual scale seen at the last fit.
+    """
+
+    reoptimize = (
+        previous is None
+        or day - previous.fitted_on_day >= refit_every
+    )
+
+    if not reoptimize:
+        result, residuals, arima_params, garch_params = _fit_arima_garch(
+            recent_demand,
+            horizon,
+            previous,
+            reoptimize=False,
+        )
+        if abs(residuals[-1]) > drift_threshold * previous.residual_scale:
+            reoptimize = True
+        else:
+            return result, previous
+
+    result, residuals, arima_params, garch_params = _fit_arima_garch(
+        recent_demand,
+        horizon,
+        previous,
+    )
+
+    # The first residual carries the diffuse initialization; skip it
+    fitted = FittedModelState(
+        arima_params=arima_params.tolist(),
+        garch_params=garch_params.tolist(),
+        fitted_on_day=day,
+        residual_scale=float(np.std(residuals[1:])) or 1.0,
+    )
+
+    return result, fitted
+
+
+# ======================================================
+# Per-product forecast jobs
+# ======================================================
+
+@dataclass
+class ForecastJob:
+    """
+    Everything needed to forecast one product, so the job can be
+    shipped to a worker process without the rest of SystemState.
+    """
+    product_id: str
+    recent_demand: List[int]
+    horizon: int
+    warmup: int
+    day: int
+    incremental: bool = False
+    previous: Optional[FittedModelState] = None
+    refit_every: int = 7
+    drift_threshold: float = 3.0
+
+
+@dataclass
+class ForecastOutcome:
+    product_id: str
+    forecast_values: List[float]
+    bands: Optional[Dict[str, List[float]]]
+    model_used: str
+    fitted: Optional[FittedModelState] = None
+    fit_seconds: float = 0.0
+    fit_failed: bool = False
+    cached: bool = False
+    fast_model: bool = False
+
+
+def run_forecast_job(job: ForecastJob) -> ForecastOutcome:
+    """
+    Forecasts one product. Used by both the serial and the
+    process-pool paths, so both produce identical results.
+
+    A fit that raises falls back to the rolling mean for the day and
+    is flagged in model_used and fit_failed.
+    """
+
+    if len(job.recent_demand) < job.warmup:
+        return ForecastOutcome(
+            product_id=job.product_id,
+            forecast_values=rolling_mean_forecast(
+                job.recent_demand,
+                job.horizon,
+            ),
+            bands=None,
+            model_used=ROLLING_MEAN,
+        )
+
+    fitted = None
+    start = time.perf_counter()
+
+    try:
+        if job.incremental:
+            result, fitted = incremental_arima_garch_forecast(
+                job.recent_demand,
+                job.horizon,
+                job.previous,
+                job.day,
+                refit_every=job.refit_every,
+                drift_threshold=job.drift_threshold,
+            )
+        else:
+            result = arima_garch_forecast(
+                job.recent_demand,
+                job.horizon,
+            )
+    except Exception:
+        return ForecastOutcome(
+            product_id=job.product_id,
+            forecast_values=rolling_mean_forecast(
+                job.recent_demand,
+                job.horizon,
+            ),
+            bands=None,
+            model_used=FIT_FAILED,
+            fitted=job.previous,
+            fit_seconds=time.perf_counter() - start,
+            fit_failed=True,
+        )
+
+    return ForecastOutcome(
+        product_id=job.product_id,
+        forecast_values=result["mean"],
+        bands={
+            "lower": result["lower"],
+            "upper": result["upper"],
+        },
+        model_used=ARIMA_GARCH,
+        fitted=fitted,
+        fit_seconds=time.perf_counter() - start,
+    )
+
+
+def run_forecast_jobs(
+    jobs: List[ForecastJob],
+    workers: int = 1,
+    executor: Optional[Executor] = None,
+) -> List[ForecastOutcome]:
+    """
+    Runs jobs serially, on the given executor, or on the shared warm
+    pool of `workers` processes (see ai.model_pool). Outcomes are
+    returned in job order regardless of which worker finished first.
+    """
+
+    if executor is None and workers <= 1:
+        return [run_forecast_job(job) for job in jobs]
+
+    pool_size = max(workers, 1)
+    chunksize = max(1, len(jobs) // (pool_size * 4))
+
+    if executor is not None:
+        return list(executor.map(run_forecast_job, jobs, chunksize=chunksize))
+
+    # Imported here: ai.model_pool imports this module
+    from ai.model_pool import shared_pool
+
+    pool = shared_pool(workers)
+    return list(pool.map(run_forecast_job, jobs, chunksize=chunksize))
+
 
 # ======================================================
 # Main Forecast Engine
@@ -90,50 +341,360 @@ def update_forecasts(
     horizon: int = 7,
     window: int = 30,
     warmup: int = 20,
+    incremental: bool = False,
+    refit_every: int = 7,
+    drift_threshold: float = 3.0,
+    workers: int = 1,
+    executor: Optional[Executor] = None,
+    instruments: Optional[Instrumentation] = None,
+    cache: Optional[ForecastCache] = None,
+    tiered: bool = False,
+    arima_threshold: float = 0.35,
+    hierarchy: Optional[str] = None,
 ) -> None:
+    """
+    Refreshes state.forecasts and appends tomorrow's point forecast
+    to the forecast history for every product.
+
+    With incremental=True the ARIMA + GARCH parameters fitted for each
+    product are kept in state.fitted_models and reused on later days
+    (see incremental_arima_garch_forecast).
+
+    Product fits run on a process pool when workers > 1 or an
+    executor is passed; results are written back in product order,
+    exactly as the serial path would.
+
+    With a ForecastCache, ARIMA + GARCH forecasts for demand windows
+    already seen are served from the cache. Incremental mode bypasses
+    the cache, since its output depends on the stored parameters.
+
+    With tiered=True, products past warmup are first forecast by the
+    batched cheap models in ai.fast_forecasters; only series that none
+    of them backtests within arima_threshold (relative MAE) go on to
+    ARIMA + GARCH.
+
+    With hierarchy set to "bottom_up", "middle_out" or "top_down" the
+    models are fitted at that level of the product -> category ->
+    total hierarchy and reconciled to per-product forecasts (see
+    ai.hierarchical). Category and total forecasts go to
+    state.group_forecasts.
+    """
+
+    jobs = [
+        ForecastJob(
+            product_id=product_id,
+            recent_demand=state.history.tail(
+                DEMAND,
+                product_id,
+                window,
+            ).tolist(),
+            horizon=horizon,
+            warmup=warmup,
+            day=state.day,
+            incremental=incremental,
+            previous=state.fitted_models.get(product_id),
+            refit_every=refit_every,
+            drift_threshold=drift_threshold,
+        )
+        for product_id in state.products
+    ]
 
-    for product_id in state.products:
+    plan = None
+    if hierarchy is not None:
+        # Imported here: ai.hierarchical imports this module
+        from ai.hierarchical import build_plan
 
-        recent_demand = extract_recent_demand(
-            state.demand_history,
-            product_id,
-            window,
+        plan = build_plan(
+            jobs,
+            {pid: p.category for pid, p in state.products.items()},
+            hierarchy,
+            state.fitted_models,
         )
+        jobs = plan.jobs
 
-        if len(recent_demand) < warmup:
-            forecast_values = rolling_mean_forecast(
-                recent_demand,
-                horizon,
-            )
-            bands = None
-            model_used = "Rolling Mean"
+    outcomes = _run_jobs(
+        jobs,
+        incremental,
+        workers,
+        executor,
+        cache,
+        tiered,
+        arima_threshold,
+    )
 
-        else:
-            result = arima_garch_forecast(
-                recent_demand,
-                horizon,
-            )
-            forecast_values = result["mean"]
-            bands = {
-                "lower": result["lower"],
-                "upper": result["upper"],
-            }
-            model_used = "ARIMA + GARCH"
-
-        # Forecast for TOMORROW
-        state.forecast_history.append(
-            DailyForecastRecord(
-                day=state.day + 1,
-                product_id=product_id,
-                forecast_for_day=forecast_values[0],
+    # Fits are counted per modeled series, before reconciliation
+    if instruments is not None:
+        instruments.record_forecasts(outcomes)
+
+    if plan is not None:
+        outcomes, levels = plan.reconcile(outcomes)
+        _apply_group_forecasts(state, levels, horizon)
+
+    for outcome in outcomes:
+        apply_forecast_outcome(state, outcome, horizon)
+
+
+def _run_jobs(
+    jobs: List[ForecastJob],
+    incremental: bool,
+    workers: int,
+    executor: Optional[Executor],
+    cache: Optional[ForecastCache],
+    tiered: bool,
+    arima_threshold: float,
+) -> List[ForecastOutcome]:
+    """
+    Outcomes of jobs, in job order: cheap tier first if tiered, then
+    the cache, then model fits for whatever is left.
+    """
+
+    outcomes: List[Optional[ForecastOutcome]] = [None] * len(jobs)
+
+    if tiered:
+        for i, outcome in _run_fast_tier(jobs, arima_threshold):
+            outcomes[i] = outcome
+
+    remaining = [i for i, outcome in enumerate(outcomes) if outcome is None]
+    remaining_jobs = [jobs[i] for i in remaining]
+
+    if cache is None or incremental:
+        computed = run_forecast_jobs(remaining_jobs, workers, executor)
+    else:
+        computed = _run_cached(remaining_jobs, cache, workers, executor)
+
+    for i, outcome in zip(remaining, computed):
+        outcomes[i] = outcome
+
+    return outcomes
+
+
+def _run_fast_tier(
+    jobs: List[ForecastJob],
+    arima_threshold: float,
+) -> List[Tuple[int, ForecastOutcome]]:
+    """
+    Forecasts every past-warmup job with the cheap model tier, one
+    batch per window length. Returns (job index, outcome) for the jobs
+    the tier handled; the rest are left for ARIMA + GARCH.
+    """
+
+    by_length: Dict[int, List[int]] = {}
+    for i, job in enumerate(jobs):
+        n = len(job.recent_demand)
+        if n >= job.warmup:
+            by_length.setdefault(n, []).append(i)
+
+    handled = []
+
+    for indices in by_length.values():
+        horizon = jobs[indices[0]].horizon
+        Y = np.array([jobs[i].recent_demand for i in indices], dtype=float)
+        selection = select_models(Y, horizon, arima_threshold=arima_threshold)
+
+        for row, i in enumerate(indices):
+            if selection.needs_arima[row]:
+                continue
+            forecast = selection.forecast[row]
+            handled.append(
+                (
+                    i,
+                    ForecastOutcome(
+                        product_id=jobs[i].product_id,
+                        forecast_values=forecast.tolist(),
+                        bands=tier_bands(forecast, selection.sigma[row]),
+                        model_used=selection.model[row],
+                        fast_model=True,
+                    ),
+                )
             )
-        )
 
-        state.forecasts[product_id] = DemandForecast(
-            product_id=product_id,
+    return handled
+
+
+def _run_cached(
+    jobs: List[ForecastJob],
+    cache: ForecastCache,
+    workers: int,
+    executor: Optional[Executor],
+) -> List[ForecastOutcome]:
+    """
+    Serves model forecasts from the cache and runs only the misses.
+
+    Jobs with the same key on the same call are fitted once; the
+    others get the result as cache hits.
+    """
+
+    outcomes: List[Optional[ForecastOutcome]] = [None] * len(jobs)
+    misses = []
+    # key -> indices of later jobs waiting on the first miss's fit
+    waiting: Dict[str, List[int]] = {}
+
+    for i, job in enumerate(jobs):
+        if len(job.recent_demand) < job.warmup:
+            misses.append((i, job, None))
+            continue
+
+        key = ForecastCache.key(job.recent_demand, job.horizon, MODEL_CONFIG)
+
+        if key in waiting:
+            waiting[key].append(i)
+            continue
+
+        cached = cache.get(key)
+
+        if cached is None:
+            misses.append((i, job, key))
+            waiting[key] = []
+            continue
+
+        outcomes[i] = _cached_outcome(job, cached)
+
+    computed = run_forecast_jobs(
+        [job for _, job, _ in misses],
+        workers,
+        executor,
+    )
+
+    for (i, _, key), outcome in zip(misses, computed):
+        outcomes[i] = outcome
+        if key is None:
+            continue
+
+        entry = (outcome.forecast_values, outcome.bands, outcome.model_used)
+        if not outcome.fit_failed:
+            cache.put(key, entry)
+
+        for j in waiting[key]:
+            if outcome.fit_failed:
+                outcomes[j] = replace(
+                    outcome,
+                    product_id=jobs[j].product_id,
+                    fitted=jobs[j].previous,
+                )
+            else:
+                cache.hits += 1
+                outcomes[j] = _cached_outcome(jobs[j], entry)
+
+    return outcomes
+
+
+def _cached_outcome(job: ForecastJob, cached: tuple) -> ForecastOutcome:
+    forecast_values, bands, model_used = cached
+    return ForecastOutcome(
+        product_id=job.product_id,
+        forecast_values=list(forecast_values),
+        bands=(
+            {name: list(v) for name, v in bands.items()}
+            if bands is not None
+            else None
+        ),
+        model_used=model_used,
+        cached=True,
+    )
+
+
+def apply_forecast_outcome(
+    state: SystemState,
+    outcome: ForecastOutcome,
+    horizon: int,
+) -> None:
+
+    product_id = outcome.product_id
+
+    if outcome.fitted is not None:
+        state.fitted_models[product_id] = outcome.fitted
+
+    # Forecast for TOMORROW
+    state.history.append(
+        FORECAST,
+        product_id,
+        state.day + 1,
+        outcome.forecast_values[0],
+    )
+
+    state.forecasts[product_id] = DemandForecast(
+        product_id=product_id,
+        horizon=horizon,
+        predicted_demand=outcome.forecast_values,
+        generated_on_day=state.day,
+        model_used=outcome.model_used,
+        confidence_bands=outcome.bands,
+    )
+
+
+def _apply_group_forecasts(
+    state: SystemState,
+    levels: Dict[str, ForecastOutcome],
+    horizon: int,
+) -> None:
+
+    # Imported here: ai.hierarchical imports this module
+    from ai.hierarchical import group_key
+
+    state.group_forecasts = {}
+
+    for name, outcome in levels.items():
+        if outcome.fitted is not None:
+            state.fitted_models[group_key(name)] = outcome.fitted
+
+        state.group_forecasts[name] = DemandForecast(
+            product_id=name,
             horizon=horizon,
-            predicted_demand=forecast_values,
+            predicted_demand=outcome.forecast_values,
             generated_on_day=state.day,
-            model_used=model_used,
-            confidence_bands=bands,
+            model_used=outcome.model_used,
+            confidence_bands=outcome.bands,
+        )
+
+
+# ======================================================
+# Accuracy
+# ======================================================
+
+def score_forecasts(state: SystemState, days: int = 1) -> None:
+    """
+    Scores the standing forecasts against the last `days` days of
+    realized demand. Call it after the simulation advances and before
+    the forecasts are refreshed.
+
+    Each day's errors go into state.accuracy, and their MAE is
+    appended to state.metrics.forecast_errors. In a multi-day block a
+    forecast is scored at the step that covered each day.
+    """
+
+    n_days = min(days, state.day)
+    columns = [
+        ([], [], [], [], [])  # product ids, forecast, actual, lower, upper
+        for _ in range(n_days)
+    ]
+
+    for product_id, forecast in state.forecasts.items():
+        realized = state.history.tail(DEMAND, product_id, n_days)
+        if len(realized) < n_days:
+            continue
+
+        bands = forecast.confidence_bands or {}
+        lower = bands.get("lower")
+        upper = bands.get("upper")
+
+        for i in range(n_days):
+            day = state.day - n_days + 1 + i
+            step = day - forecast.generated_on_day - 1
+            if not 0 <= step < len(forecast.predicted_demand):
+                continue
+
+            pids, fc, actual, lo, up = columns[i]
+            pids.append(product_id)
+            fc.append(forecast.predicted_demand[step])
+            actual.append(realized[i])
+            lo.append(lower[step] if lower is not None else np.nan)
+            up.append(upper[step] if upper is not None else np.nan)
+
+    for pids, fc, actual, lo, up in columns:
+        if not pids:
+            continue
+
+        state.accuracy.update(pids, fc, actual, lo, up)
+        state.metrics.forecast_errors.append(
+            float(np.mean(np.abs(np.subtract(fc, actual))))
         )
@@ -0,0 +1,298 @@
+# ai/hierarchical.py
+"""
+Hierarchical forecasting over product -> category -> total.
+
+A long-tail SKU sells a few units on scattered days, and a model
+fitted to that series mostly fits noise. Summed over a category the
+same demand is smooth enough to model, and one fit serves every
+product in the category.
+
+build_plan() turns the per-product ForecastJobs into jobs for the
+level that is modeled; HierarchyPlan.reconcile() maps their outcomes
+back to one outcome per product plus coherent category and total
+forecasts:
+
+    bottom_up    every product is modeled; categories and the total
+                 are the sums of their products
+    middle_out   each category is modeled and split to its products
+                 by their share of its recent demand; the total is the
+                 sum of the categories
+    top_down     only the total is modeled and split to categories and
+                 products by their share of recent demand
+
+Shares are proportions of the demand summed over the forecast window;
+a group with no demand in the window is split evenly. Products without
+a category are modeled on their own under every method except
+top_down.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from ai.forecasting import ForecastJob, ForecastOutcome
+from state.system_state import FittedModelState
+
+
+BOTTOM_UP = "bottom_up"
+MIDDLE_OUT = "middle_out"
+TOP_DOWN = "top_down"
+
+METHODS = (BOTTOM_UP, MIDDLE_OUT, TOP_DOWN)
+
+# Level name of the all-products total in the level forecasts
+TOTAL = "*"
+
+# Modeled group series are keyed "group:<name>" in job product ids
+# and in SystemState.fitted_models, apart from real product ids
+GROUP_PREFIX = "group:"
+
+BOTTOM_UP_SUM = "Bottom-up sum"
+
+_SPLIT_LABEL = {MIDDLE_OUT: "middle-out", TOP_DOWN: "top-down"}
+
+
+def group_key(name: str) -> str:
+    return GROUP_PREFIX + name
+
+
+# ======================================================
+# Helpers
+# ======================================================
+
+def _stack(series: List[List[int]]) -> np.ndarray:
+    """
+    (n_series, longest) matrix of the series, right-aligned so the
+    columns are days, zero-padded where a series is shorter.
+    """
+
+    length = max((len(s) for s in series), default=0)
+    Y = np.zeros((len(series), length))
+    for i, s in enumerate(series):
+        if len(s):
+            Y[i, length - len(s):] = s
+    return Y
+
+
+def demand_shares(Y: np.ndarray) -> np.ndarray:
+    """
+    Each row's share of the matrix's total demand.
+    """
+
+    totals = Y.sum(axis=1)
+    whole = totals.sum()
+    if whole <= 0:
+        return np.full(len(Y), 1.0 / len(Y))
+    return totals / whole
+
+
+def _as_arrays(
+    outcome: ForecastOutcome,
+) -> Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]:
+    mean = np.asarray(outcome.forecast_values, dtype=float)
+    if outcome.bands is None:
+        return mean, None, None
+    return (
+        mean,
+        np.asarray(outcome.bands["lower"], dtype=float),
+        np.asarray(outcome.bands["upper"], dtype=float),
+    )
+
+
+def _scaled(
+    outcome: ForecastOutcome,
+    product_id: str,
+    share: float,
+    model_used: str,
+) -> ForecastOutcome:
+    mean, lower, upper = _as_arrays(outcome)
+    return ForecastOutcome(
+        product_id=product_id,
+        forecast_values=(mean * share).tolist(),
+        bands=(
+            None if lower is None
+            else {
+                "lower": (lower * share).tolist(),
+                "upper": (upper * share).tolist(),
+            }
+        ),
+        model_used=model_used,
+    )
+
+
+# ======================================================
+# Plan
+# ======================================================
+
+@dataclass
+class HierarchyPlan:
+    """
+    Which series get modeled, and how their forecasts map back.
+
+    Product i takes the forecast of jobs[source[i]] times share[i].
+    """
+    method: str
+    jobs: List[ForecastJob]
+    product_ids: List[str]
+    source: np.ndarray
+    share: np.ndarray
+
+    # category -> indices of its products, in catalog order
+    categories: Dict[str, List[int]]
+
+    # category -> its share of the total (top_down only)
+    category_share: Dict[str, float]
+
+    def reconcile(
+        self,
+        outcomes: List[ForecastOutcome],
+    ) -> Tuple[List[ForecastOutcome], Dict[str, ForecastOutcome]]:
+        """
+        Maps the outcomes of self.jobs (in job order) to per-product
+        outcomes (in product order) and to level outcomes keyed by
+        category name and TOTAL.
+
+        A product that was modeled on its own keeps its outcome as-is.
+        Level outcomes of modeled groups carry their fitted state.
+        """
+
+        label = _SPLIT_LABEL.get(self.method)
+        products = []
+
+        for i, product_id in enumerate(self.product_ids):
+            outcome = outcomes[self.source[i]]
+            if outcome.product_id == product_id:
+                products.append(outcome)
+                continue
+            products.append(
+                _scaled(
+                    outcome,
+                    product_id,
+                    float(self.share[i]),
+                    f"{outcome.model_used} ({label})",
+                )
+            )
+
+        P = np.array([o.forecast_values for o in products], dtype=float)
+        by_key = {o.product_id: o for o in outcomes}
+        levels: Dict[str, ForecastOutcome] = {}
+
+        for name, rows in self.categories.items():
+            if self.method == MIDDLE_OUT:
+                levels[name] = by_key[group_key(name)]
+            elif self.method == TOP_DOWN:
+                total = by_key[group_key(TOTAL)]
+                levels[name] = _scaled(
+                    total,
+                    name,
+                    self.category_share[name],
+                    f"{total.model_used} ({label})",
+                )
+            else:
+                levels[name] = ForecastOutcome(
+                    product_id=name,
+                    forecast_values=P[rows].sum(axis=0).tolist(),
+                    bands=None,
+                    model_used=BOTTOM_UP_SUM,
+                )
+
+        if self.method == TOP_DOWN:
+            levels[TOTAL] = by_key[group_key(TOTAL)]
+        elif len(P):
+            levels[TOTAL] = ForecastOutcome(
+                product_id=TOTAL,
+                forecast_values=P.sum(axis=0).tolist(),
+                bands=None,
+                model_used=BOTTOM_UP_SUM,
+            )
+
+        return products, levels
+
+
+def build_plan(
+    jobs: List[ForecastJob],
+    categories: Mapping[str, Optional[str]],
+    method: str = MIDDLE_OUT,
+    fitted_models: Optional[Mapping[str, FittedModelState]] = None,
+) -> HierarchyPlan:
+    """
+    Plans a hierarchical forecast from per-product jobs.
+
+    `categories` maps product_id -> category (None for none). Group
+    jobs copy the settings of the product jobs, sum the members'
+    demand windows, and pick up their previous fit from
+    fitted_models under group_key(name).
+    """
+
+    if method not in METHODS:
+        raise ValueError(
+            f"Unknown hierarchy method {method!r}; expected one of "
+            f"{', '.join(METHODS)}"
+        )
+
+    fitted_models = fitted_models or {}
+    product_ids = [job.product_id for job in jobs]
+    n = len(jobs)
+
+    members: Dict[str, List[int]] = {}
+    for i, product_id in enumerate(product_ids):
+        name = categories.get(product_id)
+        if name is not None:
+            members.setdefault(name, []).append(i)
+
+    source = np.arange(n)
+    share = np.ones(n)
+    category_share: Dict[str, float] = {}
+
+    if method == BOTTOM_UP or n == 0:
+        return HierarchyPlan(
+            method=method,
+            jobs=list(jobs),
+            product_ids=product_ids,
+            source=source,
+            share=share,
+            categories=members,
+            category_share=category_share,
+        )
+
+    Y = _stack([job.recent_demand for job in jobs])
+
+    def group_job(name: str, rows) -> ForecastJob:
+        key = group_key(name)
+        return replace(
+            jobs[0],
+            product_id=key,
+            recent_demand=Y[rows].sum(axis=0).astype(int).tolist(),
+            previous=fitted_models.get(key),
+        )
+
+    if method == TOP_DOWN:
+        modeled = [group_job(TOTAL, slice(None))]
+        source[:] = 0
+        share[:] = demand_shares(Y)
+        for name, rows in members.items():
+            category_share[name] = float(share[rows].sum())
+    else:
+        modeled = []
+        grouped = np.zeros(n, dtype=bool)
+
+        for name, rows in members.items():
+            source[rows] = len(modeled)
+            share[rows] = demand_shares(Y[rows])
+            grouped[rows] = True
+            modeled.append(group_job(name, rows))
+
+        for i in np.flatnonzero(~grouped):
+            source[i] = len(modeled)
+            modeled.append(jobs[i])
+
+    return HierarchyPlan(
+        method=method,
+        jobs=modeled,
+        product_ids=product_ids,
+        source=source,
+        share=share,
+        categories=members,
+        category_share=category_share,
+    )
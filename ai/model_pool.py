@@ -0,0 +1,79 @@
+# ai/model_pool.py
+"""
+Process pools whose workers have the model libraries already loaded.
+
+A fresh worker would import statsmodels and arch on its first fit,
+so a new pool per run pays that import once per worker, every run.
+shared_pool() keeps one warm pool per size for the life of the
+process. Every worker imports the libraries as soon as it starts, and
+prewarm=True starts all workers up front, before any job arrives.
+"""
+
+import atexit
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Dict
+
+from ai.forecasting import load_model_libraries
+
+
+_POOLS: Dict[int, ProcessPoolExecutor] = {}
+
+
+def _worker_ready() -> bool:
+    return True
+
+
+def warm_pool(workers: int, prewarm: bool = True) -> ProcessPoolExecutor:
+    """
+    New pool whose workers import the model libraries at startup.
+    With prewarm=True the call returns once every worker is up.
+    """
+
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=load_model_libraries,
+    )
+
+    if prewarm:
+        wait([pool.submit(_worker_ready) for _ in range(workers)])
+
+    return pool
+
+
+def shared_pool(workers: int, prewarm: bool = True) -> ProcessPoolExecutor:
+    """
+    Warm pool of `workers` processes shared by every caller in this
+    process. It is shut down at interpreter exit, not by callers.
+    """
+
+    pool = _POOLS.get(workers)
+    if pool is None or getattr(pool, "_broken", False):
+        pool = warm_pool(workers, prewarm)
+        _POOLS[workers] = pool
+    return pool
+
+
+def terminate_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Shuts a pool down without waiting and kills its workers, including
+    any stuck in a job.
+    """
+
+    # Snapshot first; shutdown() may clear the table
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(timeout=1)
+
+
+def shutdown_pools(wait: bool = False) -> None:
+    for pool in _POOLS.values():
+        pool.shutdown(wait=wait, cancel_futures=True)
+    _POOLS.clear()
+
+
+atexit.register(shutdown_pools)
@@ -0,0 +1,360 @@
+# ai/policy_optimizer.py
+"""
+Per-product safety-factor tuning by simulation.
+
+For every product a grid of candidate safety factors is replayed with
+simulation.monte_carlo.simulate_replications, and the one with the
+lowest mean total cost (holding + stockout + understocking) wins.
+All candidates of a product are evaluated on the same pre-drawn demand
+paths (common random numbers), so the differences between them come
+from the policy, not from sampling noise.
+
+Products are independent and are spread over a process pool. Evaluated
+(product, candidate) pairs are kept in a cache dict that can be passed
+to later calls, so refinements and re-runs only simulate new points.
+
+    python -m ai.policy_optimizer catalog.csv --output policy.csv
+
+The resulting PolicyTable is a Mapping of product_id -> safety factor,
+which recommend_reorders accepts as `safety_factors`.
+
+Only the safety factor is searched. It sets the reorder point (as a
+multiple of expected lead-time demand), which is the one per-product
+knob the recommender takes; min_order_qty is a supplier constraint on
+ProductState and is simulated as given, not tuned.
+"""
+
+import argparse
+import zlib
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import astuple, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from state.system_state import ProductState
+from simulation.monte_carlo import demand_paths, simulate_replications
+
+
+DEFAULT_CANDIDATES = tuple(round(0.1 * i, 1) for i in range(11))
+
+# (product fields, start_day, n_days, n_replications, seed, safety_factor)
+CacheKey = Tuple
+PolicyCache = Dict[CacheKey, float]
+
+
+# ======================================================
+# Policy table
+# ======================================================
+
+class PolicyTable(Mapping):
+    """
+    Tuned safety factor per product, with the simulated mean cost of
+    the chosen factor and of the default one for comparison.
+    """
+
+    def __init__(
+        self,
+        safety_factors: Dict[str, float],
+        expected_cost: Optional[Dict[str, float]] = None,
+        default_cost: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.safety_factors = safety_factors
+        self.expected_cost = expected_cost or {}
+        self.default_cost = default_cost or {}
+
+    def __getitem__(self, product_id: str) -> float:
+        return self.safety_factors[product_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.safety_factors)
+
+    def __len__(self) -> int:
+        return len(self.safety_factors)
+
+    def save(self, path: Union[str, Path]) -> None:
+        import pandas as pd
+
+        pd.DataFrame(
+            {
+                "product_id": list(self.safety_factors),
+                "safety_factor": list(self.safety_factors.values()),
+                "expected_cost": [
+                    self.expected_cost.get(pid, np.nan)
+                    for pid in self.safety_factors
+                ],
+                "default_cost": [
+                    self.default_cost.get(pid, np.nan)
+                    for pid in self.safety_factors
+                ],
+            }
+        ).to_csv(path, index=False)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "PolicyTable":
+        import pandas as pd
+
+        df = pd.read_csv(path, dtype={"product_id": str})
+        ids = df["product_id"].tolist()
+
+        def column(name: str) -> Dict[str, float]:
+            if name not in df:
+                return {}
+            return dict(zip(ids, df[name].astype(float).tolist()))
+
+        return cls(
+            safety_factors=column("safety_factor"),
+            expected_cost=column("expected_cost"),
+            default_cost=column("default_cost"),
+        )
+
+
+# ======================================================
+# Evaluation
+# ======================================================
+
+@dataclass
+class PolicyTask:
+    product: ProductState
+    candidates: List[float]
+    n_days: int
+    n_replications: int
+    start_day: int
+    seed: int
+
+
+def product_seed(seed: int, product_id: str) -> np.random.SeedSequence:
+    """
+    Demand stream of one product, independent of catalog order.
+    """
+    return np.random.SeedSequence([seed, zlib.crc32(product_id.encode())])
+
+
+def evaluate_candidates(task: PolicyTask) -> List[float]:
+    """
+    Mean total cost of every candidate safety factor, all on one
+    shared block of demand paths.
+    """
+
+    product = task.product
+    demand = demand_paths(
+        product,
+        task.n_days,
+        task.n_replications,
+        start_day=task.start_day,
+        seed=product_seed(task.seed, product.product_id),
+    )
+
+    costs = []
+    for safety_factor in task.candidates:
+        result = simulate_replications(
+            product,
+            task.n_days,
+            task.n_replications,
+            safety_factor=safety_factor,
+            start_day=task.start_day,
+            demand=demand,
+        )
+        total = (
+            result.holding_cost
+            + result.stockout_cost
+            + result.understocking_cost
+        )
+        costs.append(float(total.mean()))
+
+    return costs
+
+
+def _cache_key(task: PolicyTask, safety_factor: float) -> CacheKey:
+    return (
+        astuple(task.product),
+        task.start_day,
+        task.n_days,
+        task.n_replications,
+        task.seed,
+        safety_factor,
+    )
+
+
+# ======================================================
+# Optimization
+# ======================================================
+
+def optimize_policies(
+    products: Mapping,
+    candidates: Sequence[float] = DEFAULT_CANDIDATES,
+    n_days: int = 90,
+    n_replications: int = 200,
+    start_day: int = 0,
+    seed: int = 0,
+    default_safety_factor: float = 0.3,
+    refine: bool = True,
+    workers: int = 1,
+    executor=None,
+    cache: Optional[PolicyCache] = None,
+) -> PolicyTable:
+    """
+    Picks the safety factor with the lowest simulated mean total cost
+    for every product in `products` (product_id -> ProductState).
+    Reorder points follow from the factor; order quantities and
+    min_order_qty are not searched.
+
+    The default factor is always evaluated too, for comparison. With
+    refine=True a second pass tries the midpoints on either side of
+    each product's best grid point.
+    """
+
+    if cache is None:
+        cache = {}
+
+    default_safety_factor = round(float(default_safety_factor), 6)
+    grid = sorted(
+        {round(float(c), 6) for c in candidates} | {default_safety_factor}
+    )
+    step = float(min(np.diff(grid))) if len(grid) > 1 else 0.0
+
+    tasks = {
+        pid: PolicyTask(
+            product=product,
+            candidates=grid,
+            n_days=n_days,
+            n_replications=n_replications,
+            start_day=start_day,
+            seed=seed,
+        )
+        for pid, product in products.items()
+    }
+
+    own_pool = executor is None and workers > 1
+    if own_pool:
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    try:
+        costs = _evaluate(tasks, cache, executor, workers)
+
+        if refine and step > 0:
+            for pid, task in tasks.items():
+                best = min(task.candidates, key=lambda c: costs[pid][c])
+                task.candidates = [
+                    round(float(c), 6)
+                    for c in (best - step / 2, best + step / 2)
+                    if c >= 0
+                ]
+            for pid, extra in _evaluate(
+                tasks, cache, executor, workers
+            ).items():
+                costs[pid].update(extra)
+    finally:
+        if own_pool:
+            executor.shutdown()
+
+    safety_factors = {}
+    expected_cost = {}
+    default_cost = {}
+    for pid, by_candidate in costs.items():
+        best = min(by_candidate, key=lambda c: (by_candidate[c], c))
+        safety_factors[pid] = best
+        expected_cost[pid] = by_candidate[best]
+        default_cost[pid] = by_candidate[default_safety_factor]
+
+    return PolicyTable(safety_factors, expected_cost, default_cost)
+
+
+def _evaluate(
+    tasks: Dict[str, PolicyTask],
+    cache: PolicyCache,
+    executor,
+    workers: int,
+) -> Dict[str, Dict[float, float]]:
+    """
+    Costs of every task's candidates, simulating only the ones that
+    are not cached yet.
+    """
+
+    costs: Dict[str, Dict[float, float]] = {}
+    pending: Dict[str, PolicyTask] = {}
+
+    for pid, task in tasks.items():
+        costs[pid] = {}
+        missing = []
+        for c in task.candidates:
+            key = _cache_key(task, c)
+            if key in cache:
+                costs[pid][c] = cache[key]
+            else:
+                missing.append(c)
+        if missing:
+            pending[pid] = PolicyTask(
+                product=task.product,
+                candidates=missing,
+                n_days=task.n_days,
+                n_replications=task.n_replications,
+                start_day=task.start_day,
+                seed=task.seed,
+            )
+
+    work = list(pending.values())
+    if executor is None:
+        results = map(evaluate_candidates, work)
+    else:
+        chunksize = max(1, len(work) // (4 * max(workers, 1)))
+        results = executor.map(evaluate_candidates, work, chunksize=chunksize)
+
+    for task, task_costs in zip(work, results):
+        pid = task.product.product_id
+        for c, cost in zip(task.candidates, task_costs):
+            cache[_cache_key(task, c)] = cost
+            costs[pid][c] = cost
+
+    return costs
+
+
+# ======================================================
+# CLI
+# ======================================================
+
+def main(argv=None) -> PolicyTable:
+    from simulation.catalog import load_catalog
+
+    parser = argparse.ArgumentParser(
+        description="Tune per-product safety factors by simulation.",
+    )
+    parser.add_argument("catalog", help="Product catalog (.csv or .json)")
+    parser.add_argument("--output", default="policy.csv")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--replications", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--candidates",
+        type=float,
+        nargs="+",
+        default=list(DEFAULT_CANDIDATES),
+    )
+    parser.add_argument("--no-refine", action="store_true")
+    args = parser.parse_args(argv)
+
+    table = optimize_policies(
+        load_catalog(args.catalog),
+        candidates=args.candidates,
+        n_days=args.days,
+        n_replications=args.replications,
+        seed=args.seed,
+        refine=not args.no_refine,
+        workers=args.workers,
+    )
+    table.save(args.output)
+
+    tuned = sum(table.expected_cost.values())
+    default = sum(table.default_cost.values())
+    print(f"Tuned {len(table)} products -> {args.output}")
+    print(f"  Expected cost over {args.days} days: {tuned:.0f} "
+          f"(default factor: {default:.0f})")
+
+    return table
+
+
+if __name__ == "__main__":
+    main()
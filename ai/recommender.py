@@ -1,26 +1,55 @@
 # ai/recommender.py
 
-from typing import List
+import math
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
 from state.system_state import SystemState, InventoryInsight
 
 
 def recommend_reorders(
     state: SystemState,
     safety_factor: float = 0.3,
+    vectorized: bool = False,
+    safety_factors: Optional[Mapping] = None,
 ) -> None:
     """
     Generate reorder recommendations for all products based on
     current inventory, forecasts, and lead times.
 
+    With vectorized=True all products are computed at once and
+    state.insights becomes an InsightTable (see compute_insight_table).
+
+    `safety_factors` (product_id -> factor, e.g. a PolicyTable from
+    ai.policy_optimizer) overrides safety_factor per product.
+
     This function:
-    - Reads forecasts and current stock
+    - Reads forecasts, current stock and in-transit orders
     - Computes expected demand during lead time
     - Applies safety stock
+    - Reorders when stock + in-transit is below the reorder point
     - Writes recommendations to state.insights
 
     It does NOT place orders or modify inventory.
     """
 
+    if vectorized:
+        state.insights = compute_insight_table(
+            state,
+            safety_factor,
+            safety_factors,
+        )
+        return
+
+    if safety_factors is None:
+        safety_factors = {}
+
+    # Materialize a table left behind by a vectorized run
+    if not isinstance(state.insights, dict):
+        state.insights = dict(state.insights)
+
     for product_id, product in state.products.items():
 
         # --------------------------------------------------
@@ -43,23 +72,30 @@ def recommend_reorders(
         # --------------------------------------------------
         # 3. Safety stock (simple heuristic)
         # --------------------------------------------------
-        safety_stock = safety_factor * expected_demand_lt
+        safety_stock = (
+            safety_factors.get(product_id, safety_factor)
+            * expected_demand_lt
+        )
 
         # --------------------------------------------------
         # 4. Reorder condition
         # --------------------------------------------------
+        # Inventory position: what is on hand plus what is already
+        # on the way, so open orders are not ordered again
         reorder_point = expected_demand_lt + safety_stock
         current_stock = product.current_stock
+        position = current_stock + state.pending_orders.in_transit(product_id)
 
         # --------------------------------------------------
         # 5. Decide reorder quantity
         # --------------------------------------------------
-        if current_stock < reorder_point:
-            raw_qty = reorder_point - current_stock
+        if position < reorder_point:
+            # Round up so the order actually reaches the reorder point
+            raw_qty = math.ceil(reorder_point - position)
 
             # Respect minimum order quantity
             recommended_qty = max(
-                int(raw_qty),
+                raw_qty,
                 product.min_order_qty
             )
         else:
@@ -100,3 +136,188 @@ def recommend_reorders(
             recommended_order_qty=recommended_qty,
             recommended_order_day=state.day,
         )
+
+
+# ======================================================
+# Vectorized recommender
+# ======================================================
+
+class InsightTable(Mapping):
+    """
+    Columnar reorder recommendations, one row per product.
+
+    Behaves like the Dict[str, InventoryInsight] in state.insights,
+    but InventoryInsight objects are only built when a product is
+    looked up. The arrays can be used directly for ranking.
+    """
+
+    def __init__(
+        self,
+        product_ids: List[str],
+        stockout_probability: np.ndarray,
+        expected_stockout_day: np.ndarray,
+        has_stockout_day: np.ndarray,
+        recommended_order_qty: np.ndarray,
+        recommended_order_day: int,
+        carried_over: Optional[Dict[str, InventoryInsight]] = None,
+    ) -> None:
+        self.product_ids = product_ids
+        self.stockout_probability = stockout_probability
+        self.expected_stockout_day = expected_stockout_day
+        self.has_stockout_day = has_stockout_day
+        self.recommended_order_qty = recommended_order_qty
+        self.recommended_order_day = recommended_order_day
+
+        self._row = {pid: i for i, pid in enumerate(product_ids)}
+        self.carried_over = carried_over or {}
+        self._cache: Dict[str, InventoryInsight] = {}
+
+    def row(self, product_id: str) -> int:
+        return self._row[product_id]
+
+    def __getitem__(self, product_id: str) -> InventoryInsight:
+        insight = self._cache.get(product_id)
+        if insight is not None:
+            return insight
+
+        i = self._row.get(product_id)
+        if i is None:
+            return self.carried_over[product_id]
+
+        insight = InventoryInsight(
+            product_id=product_id,
+            stockout_probability=float(self.stockout_probability[i]),
+            expected_stockout_day=(
+                int(self.expected_stockout_day[i])
+                if self.has_stockout_day[i]
+                else None
+            ),
+            recommended_order_qty=int(self.recommended_order_qty[i]),
+            recommended_order_day=self.recommended_order_day,
+        )
+        self._cache[product_id] = insight
+        return insight
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.product_ids
+        for product_id in self.carried_over:
+            if product_id not in self._row:
+                yield product_id
+
+    def __len__(self) -> int:
+        return len(self._row) + sum(
+            1 for pid in self.carried_over if pid not in self._row
+        )
+
+
+def compute_insight_table(
+    state: SystemState,
+    safety_factor: float = 0.3,
+    safety_factors: Optional[Mapping] = None,
+) -> InsightTable:
+    """
+    Same rules as recommend_reorders, evaluated for every product at
+    once on stacked arrays. Products without a forecast keep whatever
+    insight they already had.
+    """
+
+    rows = [
+        (product_id, product, state.forecasts[product_id])
+        for product_id, product in state.products.items()
+        if product_id in state.forecasts
+    ]
+    n = len(rows)
+
+    horizons = np.array(
+        [len(f.predicted_demand) for _, _, f in rows], dtype=np.int64
+    )
+    width = int(horizons.max()) if n else 0
+
+    forecasts = np.zeros((n, width))
+    for i, (_, _, f) in enumerate(rows):
+        forecasts[i, :horizons[i]] = f.predicted_demand
+
+    lead_time = np.array([p.lead_time for _, p, _ in rows], dtype=np.int64)
+    stock = np.array([p.current_stock for _, p, _ in rows], dtype=np.int64)
+    moq = np.array([p.min_order_qty for _, p, _ in rows], dtype=np.int64)
+
+    # Number of forecast days inside the lead time (the slice length)
+    k = np.clip(np.minimum(lead_time, horizons), 0, None)
+    has_slice = k > 0
+
+    # Running sums add left to right, exactly like sum() on the slice
+    cumulative = np.cumsum(forecasts, axis=1)
+    expected_demand_lt = np.zeros(n)
+    expected_demand_lt[has_slice] = cumulative[
+        np.flatnonzero(has_slice), k[has_slice] - 1
+    ]
+
+    if safety_factors is None:
+        factor = safety_factor
+    else:
+        factor = np.array(
+            [safety_factors.get(pid, safety_factor) for pid, _, _ in rows],
+            dtype=float,
+        )
+
+    safety_stock = factor * expected_demand_lt
+    reorder_point = expected_demand_lt + safety_stock
+
+    position = stock + state.pending_orders.in_transit_array(
+        [pid for pid, _, _ in rows]
+    )
+
+    reorder = position < reorder_point
+    recommended_qty = np.where(
+        reorder,
+        np.maximum(np.ceil(reorder_point - position).astype(np.int64), moq),
+        0,
+    )
+
+    positive = expected_demand_lt > 0
+    ratio = np.divide(
+        stock,
+        expected_demand_lt,
+        out=np.zeros(n),
+        where=positive,
+    )
+    stockout_probability = np.where(
+        positive,
+        np.minimum(1.0, np.maximum(0.0, 1 - ratio)),
+        0.0,
+    )
+
+    daily_avg = np.divide(
+        expected_demand_lt,
+        k,
+        out=np.zeros(n),
+        where=has_slice,
+    )
+    has_stockout_day = (recommended_qty > 0) & has_slice & (daily_avg > 0)
+    days_left = np.divide(
+        stock,
+        daily_avg,
+        out=np.zeros(n),
+        where=has_stockout_day,
+    )
+    expected_stockout_day = np.where(
+        has_stockout_day,
+        state.day + np.trunc(days_left).astype(np.int64),
+        -1,
+    )
+
+    carried_over = {
+        pid: insight
+        for pid, insight in state.insights.items()
+        if pid not in state.forecasts
+    }
+
+    return InsightTable(
+        product_ids=[pid for pid, _, _ in rows],
+        stockout_probability=stockout_probability,
+        expected_stockout_day=expected_stockout_day,
+        has_stockout_day=has_stockout_day,
+        recommended_order_qty=recommended_qty,
+        recommended_order_day=state.day,
+        carried_over=carried_over,
+    )
@@ -1,11 +1,19 @@
 # app.py
 
+import os
+
 import streamlit as st
+import numpy as np
 import pandas as pd
 
 from state.system_state import SystemState, ProductState
+from simulation.catalog import load_catalog
+from dashboard.chart_data import DemandForecastSeries
+from dashboard.ranking import risk_arrays, top_k_at_risk
 from simulation.daily_pipeline import run_daily_cycle
-from simulation.user_actions import user_restock
+from ai.background import BackgroundForecaster
+from simulation.user_actions import user_restock, accept_recommendations
+from ai.recommender import recommend_reorders
 
 
 # ==================================================
@@ -17,32 +25,82 @@ st.set_page_config(
 )
 
 
+# Longer histories are min/max-downsampled before charting
+MAX_CHART_POINTS = 500
+
+# Products shown in the "most at risk" panel and per catalog page
+TOP_K_AT_RISK = 10
+CATALOG_PAGE_SIZE = 25
+
+
 # ==================================================
 # Initialize state (runs once)
 # ==================================================
 if "state" not in st.session_state:
 
-    product = ProductState(
-        product_id="A101",
-        name="Milk",
-        current_stock=50,
-        base_demand=12,
-        trend_slope=0.01,
-        seasonality_amplitude=2,
-        lead_time=3,
-        min_order_qty=50,
-        holding_cost=2.0,
-        stockout_cost=10.0,
-        price=30.0,
-    )
-
     state = SystemState()
-    state.products["A101"] = product
+
+    # A catalog file replaces the single demo product
+    catalog_path = os.environ.get("INVENTORY_CATALOG")
+
+    if catalog_path:
+        state.products.update(load_catalog(catalog_path))
+    else:
+        state.products["A101"] = ProductState(
+            product_id="A101",
+            name="Milk",
+            current_stock=50,
+            base_demand=12,
+            trend_slope=0.01,
+            seasonality_amplitude=2,
+            lead_time=3,
+            min_order_qty=50,
+            holding_cost=2.0,
+            stockout_cost=10.0,
+            price=30.0,
+        )
+
     st.session_state.state = state
 
+    # Fits run in the background while the operator reviews the day
+    st.session_state.forecaster = BackgroundForecaster()
+
+    # Per-product chart series, created lazily on first selection
+    st.session_state.chart_series = {}
+    st.session_state.chart_frames = {}
+    st.session_state.at_risk = (None, [])
+
+    # Bumped when orders placed from the UI refresh the insights
+    st.session_state.insights_version = 0
+    st.session_state.order_notice = None
+    st.session_state.keep_selected = None
+
 
 state: SystemState = st.session_state.state
-product = state.products["A101"]
+product_ids = list(state.products)
+
+
+# ==================================================
+# Most-at-risk ranking (recomputed when the insights change)
+# ==================================================
+ranking_key = (state.day, st.session_state.insights_version)
+ranked_key, at_risk = st.session_state.at_risk
+if ranked_key != ranking_key:
+    at_risk = top_k_at_risk(risk_arrays(state.insights), TOP_K_AT_RISK)
+    st.session_state.at_risk = (ranking_key, at_risk)
+
+
+def refresh_after_orders(notice: str, selected: str) -> None:
+    """
+    Recomputes recommendations so the new orders count as in transit,
+    then reruns with a fresh ranking, the same product selected and
+    `notice` shown.
+    """
+    recommend_reorders(state)
+    st.session_state.insights_version += 1
+    st.session_state.order_notice = notice
+    st.session_state.keep_selected = selected
+    st.rerun()
 
 
 # ==================================================
@@ -61,7 +119,7 @@ st.caption(
 m1, m2, m3, m4, m5 = st.columns(5)
 
 m1.metric("Day", state.day)
-m2.metric("Stock", product.current_stock)
+m2.metric("Products", len(product_ids))
 m3.metric("Pending", len(state.pending_orders))
 m4.metric("Holding Cost", f"₹{state.metrics.total_holding_cost:.0f}")
 m5.metric("Understock Cost", f"₹{state.metrics.total_understocking_cost:.0f}")
@@ -77,33 +135,84 @@ left, right = st.columns([2.2, 1])
 # LEFT — Analytics (NO SCROLL)
 # ==================================================
 with left:
+    st.subheader("⚠️ Most at Risk")
+
+    if at_risk:
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "Product": at_risk,
+                    "Name": [state.products[p].name for p in at_risk],
+                    "Stock": [
+                        state.products[p].current_stock for p in at_risk
+                    ],
+                    "Stockout Risk": [
+                        round(state.insights[p].stockout_probability, 2)
+                        for p in at_risk
+                    ],
+                    "Expected Stockout Day": [
+                        state.insights[p].expected_stockout_day
+                        for p in at_risk
+                    ],
+                    "Recommended Order": [
+                        state.insights[p].recommended_order_qty
+                        for p in at_risk
+                    ],
+                }
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+    else:
+        st.info("No recommendations yet.")
+
+    # At-risk products first, so the riskiest is selected by default
+    at_risk_set = set(at_risk)
+    ordered = at_risk + [p for p in product_ids if p not in at_risk_set]
+
+    # After an order the ranking changes; keep the product in view
+    keep = st.session_state.keep_selected
+    st.session_state.keep_selected = None
+
+    selected = st.selectbox(
+        "Product",
+        ordered,
+        index=ordered.index(keep) if keep in state.products else 0,
+        format_func=lambda p: f"{p} — {state.products[p].name}",
+    )
+    product = state.products[selected]
+
     st.subheader("📈 Demand vs Forecast (History)")
     st.caption("Forecasts are frozen when made; demand is uncensored.")
 
-    actual_demand = {
-        r.day: r.demand
-        for r in state.demand_history
-        if r.product_id == "A101"
-    }
+    # Derived series live in the session and only ingest new days;
+    # the rendered frame is rebuilt only when the day changes.
+    series = st.session_state.chart_series.get(selected)
+    if series is None:
+        series = DemandForecastSeries(selected)
+        st.session_state.chart_series[selected] = series
 
-    predicted = {
-        r.day: r.forecast_for_day
-        for r in state.forecast_history
-        if r.product_id == "A101"
-    }
+    cached_day, df_hist = st.session_state.chart_frames.get(
+        selected, (None, None)
+    )
+    if cached_day != state.day:
+        series.update(state.history)
+        df_hist = series.frame(max_points=MAX_CHART_POINTS)
+        st.session_state.chart_frames[selected] = (state.day, df_hist)
 
-    days = sorted(set(actual_demand) & set(predicted))
+    if len(df_hist):
+        st.line_chart(df_hist, height=320)
 
-    if days:
-        df_hist = pd.DataFrame(
-            {
-                "Actual Demand": [actual_demand[d] for d in days],
-                "Forecast": [predicted[d] for d in days],
-            },
-            index=days,
+        accuracy = state.accuracy.product(selected)
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("MAE", f"{accuracy['mae']:.2f}")
+        c2.metric("RMSE", f"{accuracy['rmse']:.2f}")
+        c3.metric("Bias", f"{accuracy['bias']:+.2f}")
+        c4.metric(
+            "Band Coverage",
+            "—" if np.isnan(accuracy["coverage"])
+            else f"{accuracy['coverage']:.0%}",
         )
-        df_hist.index.name = "Day"
-        st.line_chart(df_hist, height=320)
     else:
         st.info("Advance a few days to see forecast accuracy.")
 
@@ -114,7 +223,7 @@ with left:
 with right:
     st.subheader("🤖 AI Recommendation")
 
-    insight = state.insights.get("A101")
+    insight = state.insights.get(selected)
 
     if insight:
         st.metric("Recommended Order", insight.recommended_order_qty)
@@ -135,17 +244,35 @@ with right:
     )
 
     if st.button("📦 Place Restock Order", use_container_width=True):
-        user_restock(state, "A101", restock_qty)
-        st.success(
-            f"Order placed • arrives in {product.lead_time} days"
-        )
+        if restock_qty > 0:
+            user_restock(state, selected, restock_qty)
+            refresh_after_orders(
+                f"Order placed • arrives in {product.lead_time} days",
+                selected,
+            )
+        else:
+            st.warning("Enter a quantity above 0 to place an order.")
+
+    st.caption(
+        f"In transit: {state.pending_orders.in_transit(selected)} units"
+    )
+
+    st.divider()
+
+    if st.button("✅ Accept All Recommendations", use_container_width=True):
+        placed = accept_recommendations(state)
+        refresh_after_orders(f"{len(placed)} orders placed", selected)
+
+    if st.session_state.order_notice:
+        st.success(st.session_state.order_notice)
+        st.session_state.order_notice = None
 
 
 # ==================================================
 # 🔮 FUTURE FORECAST — HIDDEN BY DEFAULT
 # ==================================================
 with st.expander("🔮 Forecast for Next 7 Days (Planning Only)"):
-    forecast = state.forecasts.get("A101")
+    forecast = state.forecasts.get(selected)
 
     if forecast:
         st.table(
@@ -162,6 +289,46 @@ with st.expander("🔮 Forecast for Next 7 Days (Planning Only)"):
         st.info("No future forecast yet.")
 
 
+# ==================================================
+# 📋 CATALOG — PAGINATED
+# ==================================================
+with st.expander("📋 Product Catalog"):
+    n_pages = max(1, -(-len(product_ids) // CATALOG_PAGE_SIZE))
+    page = st.number_input(
+        f"Page (of {n_pages})",
+        min_value=1,
+        max_value=n_pages,
+        step=1,
+    )
+    page_ids = product_ids[
+        (page - 1) * CATALOG_PAGE_SIZE:page * CATALOG_PAGE_SIZE
+    ]
+
+    page_insights = [state.insights.get(p) for p in page_ids]
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "Product": page_ids,
+                "Name": [state.products[p].name for p in page_ids],
+                "Stock": [state.products[p].current_stock for p in page_ids],
+                "In Transit": [
+                    state.pending_orders.in_transit(p) for p in page_ids
+                ],
+                "Stockout Risk": [
+                    round(i.stockout_probability, 2) if i else None
+                    for i in page_insights
+                ],
+                "Recommended Order": [
+                    i.recommended_order_qty if i else None
+                    for i in page_insights
+                ],
+            }
+        ),
+        hide_index=True,
+        use_container_width=True,
+    )
+
+
 # ==================================================
 # ▶ PRIMARY ACTION
 # ==================================================
@@ -172,5 +339,5 @@ if st.button(
     type="primary",
     use_container_width=True,
 ):
-    run_daily_cycle(state)
+    run_daily_cycle(state, forecaster=st.session_state.forecaster)
     st.rerun()
@@ -0,0 +1,316 @@
+# benchmarks/bench_pipeline.py
+"""
+Benchmarks for the daily pipeline's hot paths.
+
+    python -m benchmarks.bench_pipeline --products 1 100 1000 10000 \
+        --history 10 100 1000 --output results.json
+
+    python -m benchmarks.bench_pipeline --baseline results.json
+
+Every case runs on a seeded synthetic catalog whose demand history is
+prefilled to the requested length, so results are reproducible.
+Each stage reports its best and median wall time over --repeat runs
+and its peak traced memory. With --baseline the run is compared
+stage by stage, and the exit status is non-zero if any stage is
+slower than the baseline by more than --tolerance.
+"""
+
+import argparse
+import copy
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from state.system_state import SystemState
+from state.history_store import DEMAND
+from simulation.catalog import synthetic_catalog, build_state
+from simulation.demand_generator import demand_params, generate_demand_batch
+from simulation.engine import advance_one_day
+from simulation.order_processor import place_order, place_orders
+from ai.forecasting import update_forecasts, load_model_libraries
+from ai.recommender import recommend_reorders
+
+
+# ======================================================
+# Fixtures
+# ======================================================
+
+def make_state(
+    n_products: int,
+    history_days: int,
+    seed: int = 0,
+) -> SystemState:
+    """
+    Seeded catalog with `history_days` of demand already recorded.
+    """
+
+    state = build_state(synthetic_catalog(n_products, seed), seed=seed)
+
+    if history_days:
+        days = np.arange(1, history_days + 1)
+        block = generate_demand_batch(
+            demand_params(state.products.values()),
+            days,
+            state.rng,
+        )
+        for j, product_id in enumerate(state.products):
+            state.history.extend(DEMAND, product_id, days, block[:, j])
+        state.day = history_days
+
+    return state
+
+
+# ======================================================
+# Measurement
+# ======================================================
+
+def measure(
+    setup: Callable[[], SystemState],
+    stage: Callable[[SystemState], None],
+    repeat: int,
+) -> Dict[str, float]:
+    """
+    Times `stage` on a fresh fixture from `setup` per repetition,
+    then reruns it once under tracemalloc for peak memory.
+    """
+
+    timings = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        stage(state)
+        timings.append(time.perf_counter() - start)
+
+    state = setup()
+    tracemalloc.start()
+    stage(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "best_s": min(timings),
+        "median_s": statistics.median(timings),
+        "peak_kib": peak / 1024,
+    }
+
+
+def _place_orders(state: SystemState) -> None:
+    for product_id in state.products:
+        place_order(state, product_id, 10)
+
+
+def _place_orders_bulk(state: SystemState) -> None:
+    product_ids = list(state.products)
+    place_orders(state, product_ids, [10] * len(product_ids))
+
+
+def run_case(
+    n_products: int,
+    history_days: int,
+    repeat: int,
+    arima_products: int,
+    seed: int = 0,
+) -> Dict[str, Dict[str, float]]:
+
+    base = make_state(n_products, history_days, seed)
+
+    def fresh() -> SystemState:
+        return copy.deepcopy(base)
+
+    # Forecasts are needed before recommend_reorders can do any work
+    with_forecasts = fresh()
+    update_forecasts(with_forecasts, warmup=10**9)
+
+    def fresh_with_forecasts() -> SystemState:
+        return copy.deepcopy(with_forecasts)
+
+    stages = {
+        "advance_one_day": (fresh, advance_one_day),
+        "update_forecasts_rolling_mean": (
+            fresh,
+            lambda s: update_forecasts(s, warmup=10**9),
+        ),
+        "recommend_reorders": (fresh_with_forecasts, recommend_reorders),
+        "recommend_reorders_vectorized": (
+            fresh_with_forecasts,
+            lambda s: recommend_reorders(s, vectorized=True),
+        ),
+        "place_order": (fresh, _place_orders),
+        "place_orders_bulk": (fresh, _place_orders_bulk),
+    }
+
+    results = {
+        name: measure(setup, stage, repeat)
+        for name, (setup, stage) in stages.items()
+    }
+
+    # ARIMA + GARCH fits are slow; time a fixed-size slice of the
+    # catalog and report per-product cost as well.
+    if arima_products > 0 and history_days >= 20:
+        subset_ids = list(base.products)[:arima_products]
+
+        def fresh_subset() -> SystemState:
+            state = fresh()
+            state.products = {
+                pid: state.products[pid] for pid in subset_ids
+            }
+            return state
+
+        # The first fit in a process imports statsmodels and arch;
+        # report that once as its own stage, not inside the fits
+        if load_model_libraries.cache_info().currsize == 0:
+            start = time.perf_counter()
+            load_model_libraries()
+            elapsed = time.perf_counter() - start
+            results["load_model_libraries"] = {
+                "best_s": elapsed,
+                "median_s": elapsed,
+            }
+
+        arima = measure(
+            fresh_subset,
+            lambda s: update_forecasts(s),
+            max(1, repeat // 3),
+        )
+        arima["per_product_s"] = arima["best_s"] / len(subset_ids)
+        results["update_forecasts_arima_garch"] = arima
+
+    return results
+
+
+# ======================================================
+# Baseline comparison
+# ======================================================
+
+def compare(
+    current: Dict,
+    baseline: Dict,
+    tolerance: float,
+) -> List[str]:
+    """
+    Returns one line per stage slower than baseline * (1 + tolerance).
+    """
+
+    regressions = []
+    base_cases = {
+        (c["products"], c["history_days"]): c["stages"]
+        for c in baseline["cases"]
+    }
+
+    for case in current["cases"]:
+        key = (case["products"], case["history_days"])
+        base_stages = base_cases.get(key)
+        if base_stages is None:
+            continue
+        for stage, stats in case["stages"].items():
+            ref = base_stages.get(stage)
+            if ref is None or ref["best_s"] <= 0:
+                continue
+            ratio = stats["best_s"] / ref["best_s"]
+            if ratio > 1 + tolerance:
+                regressions.append(
+                    f"{stage} @ products={key[0]} history={key[1]}: "
+                    f"{ref['best_s'] * 1e3:.2f}ms -> "
+                    f"{stats['best_s'] * 1e3:.2f}ms ({ratio:.2f}x)"
+                )
+
+    return regressions
+
+
+# ======================================================
+# CLI
+# ======================================================
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the daily pipeline's hot paths.",
+    )
+    parser.add_argument(
+        "--products", type=int, nargs="+", default=[1, 100, 1000, 10000],
+    )
+    parser.add_argument(
+        "--history", type=int, nargs="+", default=[10, 100, 1000],
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--arima-products",
+        type=int,
+        default=10,
+        help="Products to fit in the ARIMA + GARCH stage (0 to skip)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON here")
+    parser.add_argument("--baseline", help="JSON results to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "cases": [],
+    }
+
+    for n_products in args.products:
+        for history_days in args.history:
+            stages = run_case(
+                n_products,
+                history_days,
+                args.repeat,
+                args.arima_products,
+                args.seed,
+            )
+            report["cases"].append(
+                {
+                    "products": n_products,
+                    "history_days": history_days,
+                    "stages": stages,
+                }
+            )
+            for stage, stats in stages.items():
+                # Stages that can only run once have no traced peak
+                peak = (
+                    f"{stats['peak_kib']:10.1f}KiB"
+                    if "peak_kib" in stats
+                    else f"{'n/a':>13}"
+                )
+                print(
+                    f"products={n_products:>6} history={history_days:>5} "
+                    f"{stage:<32} best={stats['best_s'] * 1e3:10.3f}ms "
+                    f"peak={peak}",
+                    file=sys.stderr,
+                )
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
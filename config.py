@@ -0,0 +1,35 @@
+# config.py
+
+from dataclasses import dataclass
+from typing import Mapping, Optional
+
+
+@dataclass
+class PipelineConfig:
+    """
+    Tunables for one run of the daily cycle.
+
+    Defaults reproduce the behaviour of the interactive dashboard.
+    """
+
+    # Forecasting
+    horizon: int = 7
+    window: int = 30
+    warmup: int = 20
+    incremental: bool = False
+    refit_every: int = 7
+    drift_threshold: float = 3.0
+    workers: int = 1
+    tiered: bool = False
+    arima_threshold: float = 0.35
+
+    # Fit models per category / total instead of per product:
+    # "bottom_up", "middle_out" or "top_down" (see ai.hierarchical)
+    hierarchy: Optional[str] = None
+
+    # Recommendations
+    safety_factor: float = 0.3
+    vectorized_recommender: bool = False
+
+    # Per-product overrides of safety_factor (see ai.policy_optimizer)
+    safety_factors: Optional[Mapping[str, float]] = None
@@ -0,0 +1,125 @@
+# dashboard/chart_data.py
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from state.history_store import HistoryStore, DEMAND, FORECAST
+
+
+class DemandForecastSeries:
+    """
+    Actual demand joined with the forecast made for the same day,
+    for one product, kept up to date incrementally.
+
+    update() only reads history rows newer than the last day it saw,
+    so the cost per rerun is proportional to the new days rather than
+    the full history.
+    """
+
+    def __init__(self, product_id: str) -> None:
+        self.product_id = product_id
+
+        self.days = np.empty(0, dtype=np.int64)
+        self.actual = np.empty(0, dtype=np.float64)
+        self.forecast = np.empty(0, dtype=np.float64)
+        self._size = 0
+
+        self._last_demand_day = 0
+        self._last_forecast_day = 0
+
+        # Days seen on one side only, waiting for the other
+        self._pending_demand: Dict[int, float] = {}
+        self._pending_forecast: Dict[int, float] = {}
+
+    def update(self, history: HistoryStore) -> None:
+        new_rows = []
+
+        days, values = history.series(DEMAND, self.product_id)
+        start = np.searchsorted(days, self._last_demand_day, side="right")
+        for day, value in zip(days[start:].tolist(), values[start:].tolist()):
+            forecast = self._pending_forecast.pop(day, None)
+            if forecast is None:
+                self._pending_demand[day] = value
+            else:
+                new_rows.append((day, value, forecast))
+        if len(days):
+            self._last_demand_day = int(days[-1])
+
+        days, values = history.series(FORECAST, self.product_id)
+        start = np.searchsorted(days, self._last_forecast_day, side="right")
+        for day, value in zip(days[start:].tolist(), values[start:].tolist()):
+            actual = self._pending_demand.pop(day, None)
+            if actual is None:
+                self._pending_forecast[day] = value
+            else:
+                new_rows.append((day, actual, value))
+        if len(days):
+            self._last_forecast_day = int(days[-1])
+
+        if new_rows:
+            new_rows.sort()
+            self._append(np.array(new_rows, dtype=np.float64))
+
+    def _append(self, rows: np.ndarray) -> None:
+        n = len(rows)
+        if self._size + n > len(self.days):
+            capacity = max(2 * len(self.days), self._size + n, 64)
+            self.days = np.resize(self.days, capacity)
+            self.actual = np.resize(self.actual, capacity)
+            self.forecast = np.resize(self.forecast, capacity)
+
+        end = self._size + n
+        self.days[self._size:end] = rows[:, 0]
+        self.actual[self._size:end] = rows[:, 1]
+        self.forecast[self._size:end] = rows[:, 2]
+        self._size = end
+
+    def __len__(self) -> int:
+        return self._size
+
+    def frame(self, max_points: Optional[int] = None) -> pd.DataFrame:
+        """
+        Chart-ready frame, min/max-downsampled to about max_points rows.
+        """
+
+        days = self.days[:self._size]
+        columns = {
+            "Actual Demand": self.actual[:self._size],
+            "Forecast": self.forecast[:self._size],
+        }
+
+        if max_points is not None and self._size > max_points:
+            keep = minmax_indices(list(columns.values()), max_points)
+            days = days[keep]
+            columns = {name: col[keep] for name, col in columns.items()}
+
+        df = pd.DataFrame(columns, index=days)
+        df.index.name = "Day"
+        return df
+
+
+def minmax_indices(columns, max_points: int) -> np.ndarray:
+    """
+    Row indices that keep each bucket's minimum and maximum of every
+    column, so spikes and dips survive downsampling.
+    """
+
+    n = len(columns[0])
+    per_bucket = 2 * len(columns)
+    bucket = max(1, -(-n * per_bucket // max_points))
+    n_buckets = -(-n // bucket)
+
+    padded = n_buckets * bucket
+    offsets = np.arange(n_buckets) * bucket
+
+    keep = [np.array([0, n - 1])]
+    for col in columns:
+        grid = np.full(padded, np.nan)
+        grid[:n] = col
+        grid = grid.reshape(n_buckets, bucket)
+        keep.append(np.nanargmin(grid, axis=1) + offsets)
+        keep.append(np.nanargmax(grid, axis=1) + offsets)
+
+    return np.unique(np.concatenate(keep))
@@ -0,0 +1,85 @@
+# dashboard/ranking.py
+
+from dataclasses import dataclass
+from typing import List, Mapping
+
+import numpy as np
+
+from state.system_state import InventoryInsight
+from ai.recommender import InsightTable
+
+
+@dataclass
+class RiskArrays:
+    """
+    Stockout risk of every product with an insight, as aligned arrays.
+    Products without an expected stockout day get +inf.
+    """
+    product_ids: List[str]
+    stockout_probability: np.ndarray
+    expected_stockout_day: np.ndarray
+
+
+def risk_arrays(insights: Mapping[str, InventoryInsight]) -> RiskArrays:
+    """
+    Reads the columns straight from an InsightTable; a plain dict of
+    insights is converted in one pass.
+    """
+
+    if isinstance(insights, InsightTable) and not insights.carried_over:
+        day = insights.expected_stockout_day.astype(np.float64)
+        day[~insights.has_stockout_day] = np.inf
+        return RiskArrays(
+            product_ids=insights.product_ids,
+            stockout_probability=insights.stockout_probability,
+            expected_stockout_day=day,
+        )
+
+    values = list(insights.values())
+    return RiskArrays(
+        product_ids=[i.product_id for i in values],
+        stockout_probability=np.array(
+            [i.stockout_probability for i in values], dtype=np.float64
+        ),
+        expected_stockout_day=np.array(
+            [
+                np.inf if i.expected_stockout_day is None
+                else i.expected_stockout_day
+                for i in values
+            ],
+            dtype=np.float64,
+        ),
+    )
+
+
+def top_k_at_risk(risk: RiskArrays, k: int) -> List[str]:
+    """
+    The k products most at risk: highest stockout probability first,
+    earliest expected stockout day breaking ties.
+
+    Selection is a partial sort (np.partition / np.argpartition),
+    O(n) in the catalog size; only the k winners are fully sorted.
+    """
+
+    prob = risk.stockout_probability
+    day = risk.expected_stockout_day
+    n = len(prob)
+
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    # k-th largest probability; everything above it is in
+    threshold = np.partition(prob, n - k)[n - k]
+    above = np.flatnonzero(prob > threshold)
+    ties = np.flatnonzero(prob == threshold)
+
+    # Fill the remaining slots from the tie group, earliest days first
+    need = k - len(above)
+    if need < len(ties):
+        ties = ties[np.argpartition(day[ties], need - 1)[:need]]
+
+    chosen = np.concatenate([above, ties])
+    order = np.lexsort((day[chosen], -prob[chosen]))
+
+    return [risk.product_ids[i] for i in chosen[order]]
@@ -0,0 +1,107 @@
+# monitoring/import_report.py
+"""
+Import-time report for the project's entry points.
+
+Each module is imported in a fresh interpreter with `python -X
+importtime`, so nothing is already cached. The report gives the
+total import time of each module and the top-level packages that
+account for most of it:
+
+    python -m monitoring.import_report simulation.runner app
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+
+DEFAULT_MODULES = (
+    "simulation.engine",
+    "ai.forecasting",
+    "simulation.runner",
+)
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+_PROJECT_ROOT = str(Path(__file__).resolve().parents[1])
+
+
+@dataclass
+class ImportReport:
+    module: str
+    total_seconds: float
+    # top-level package -> seconds spent in its own modules
+    by_package: Dict[str, float] = field(default_factory=dict)
+
+    def heaviest(self, n: int = 5) -> List[tuple]:
+        return sorted(
+            self.by_package.items(),
+            key=lambda item: item[1],
+            reverse=True,
+        )[:n]
+
+
+def measure_import(module: str) -> ImportReport:
+    """
+    Imports `module` in a subprocess and parses its -X importtime log.
+    """
+
+    path = os.pathsep.join(
+        p for p in (_PROJECT_ROOT, os.environ.get("PYTHONPATH")) if p
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": path},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    by_package: Dict[str, float] = defaultdict(float)
+    total = 0.0
+
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, name = match.groups()
+        by_package[name.split(".")[0]] += int(self_us) / 1e6
+        if name == module:
+            total = int(cumulative_us) / 1e6
+
+    return ImportReport(module, total, dict(by_package))
+
+
+def import_report(
+    modules: Sequence[str] = DEFAULT_MODULES,
+) -> List[ImportReport]:
+    return [measure_import(module) for module in modules]
+
+
+def main(argv=None) -> List[ImportReport]:
+    parser = argparse.ArgumentParser(
+        description="Report cold import time of project modules.",
+    )
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES))
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    reports = import_report(args.modules)
+
+    for report in reports:
+        print(f"{report.module}: {report.total_seconds:.3f}s")
+        for package, seconds in report.heaviest(args.top):
+            print(f"  {package:<24} {seconds:.3f}s")
+
+    return reports
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# monitoring/instrumentation.py
+
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Optional
+
+
+_NO_STAGE = nullcontext()
+
+
+class Instrumentation:
+    """
+    In-memory metrics registry for the daily cycle.
+
+    Records, per simulated day:
+    - wall and CPU time of every pipeline stage
+    - counts of ARIMA + GARCH fits, rolling-mean forecasts, failed
+      fits, forecast-cache hits and cheap-tier forecasts
+    - the slowest per-product model fits
+
+    and keeps running totals for export as JSON lines or Prometheus
+    text format. Pipeline functions take an optional instance; passing
+    None skips all bookkeeping.
+    """
+
+    def __init__(self, slowest_fits: int = 5) -> None:
+        self.slowest_fits = slowest_fits
+
+        self.days: List[dict] = []
+        self.stage_wall_seconds: Dict[str, float] = {}
+        self.stage_cpu_seconds: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {
+            "days": 0,
+            "arima_fits": 0,
+            "rolling_mean_forecasts": 0,
+            "fit_failures": 0,
+            "cache_hits": 0,
+            "fast_forecasts": 0,
+        }
+        self.product_fit_seconds: Dict[str, float] = {}
+
+        self._current: Optional[dict] = None
+
+    # --------------------------------------------------
+    # Recording
+    # --------------------------------------------------
+    def begin_day(self, day: int) -> None:
+        self._current = {
+            "day": day,
+            "stages": {},
+            "forecasts": {
+                "arima_fits": 0,
+                "rolling_mean_forecasts": 0,
+                "fit_failures": 0,
+                "cache_hits": 0,
+                "fast_forecasts": 0,
+                "fit_seconds": 0.0,
+                "slowest": [],
+            },
+        }
+
+    def end_day(self) -> None:
+        if self._current is None:
+            return
+        self.days.append(self._current)
+        self.counters["days"] += 1
+        self._current = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+
+            self.stage_wall_seconds[name] = (
+                self.stage_wall_seconds.get(name, 0.0) + wall
+            )
+            self.stage_cpu_seconds[name] = (
+                self.stage_cpu_seconds.get(name, 0.0) + cpu
+            )
+            if self._current is not None:
+                self._current["stages"][name] = {
+                    "wall_s": wall,
+                    "cpu_s": cpu,
+                }
+
+    def record_forecasts(self, outcomes) -> None:
+        """
+        Tallies one day's forecast outcomes (ai.forecasting.ForecastOutcome).
+        """
+
+        day = self._current["forecasts"] if self._current else None
+        fits = []
+
+        # Only model fits are timed; rolling-mean forecasts report 0s
+        for outcome in outcomes:
+            if outcome.fit_failed:
+                key = "fit_failures"
+            elif outcome.cached:
+                key = "cache_hits"
+            elif outcome.fast_model:
+                key = "fast_forecasts"
+            elif outcome.fit_seconds > 0:
+                key = "arima_fits"
+            else:
+                key = "rolling_mean_forecasts"
+
+            self.counters[key] += 1
+            if day is not None:
+                day[key] += 1
+
+            if outcome.fit_seconds > 0:
+                fits.append((outcome.fit_seconds, outcome.product_id))
+                self.product_fit_seconds[outcome.product_id] = (
+                    self.product_fit_seconds.get(outcome.product_id, 0.0)
+                    + outcome.fit_seconds
+                )
+
+        if day is not None and fits:
+            day["fit_seconds"] += sum(t for t, _ in fits)
+            fits.sort(reverse=True)
+            day["slowest"] = [
+                {"product_id": pid, "fit_s": t}
+                for t, pid in fits[:self.slowest_fits]
+            ]
+
+    # --------------------------------------------------
+    # Export
+    # --------------------------------------------------
+    def to_json_lines(self) -> str:
+        """
+        One JSON object per recorded day.
+        """
+        return "".join(json.dumps(d) + "\n" for d in self.days)
+
+    def to_prometheus(self, top_products: int = 10) -> str:
+        """
+        Cumulative totals in Prometheus text exposition format.
+        """
+
+        lines = [
+            "# HELP inventory_days_total Simulated days recorded.",
+            "# TYPE inventory_days_total counter",
+            f"inventory_days_total {self.counters['days']}",
+            "# HELP inventory_stage_seconds_total Time spent per stage.",
+            "# TYPE inventory_stage_seconds_total counter",
+        ]
+        for name, seconds in sorted(self.stage_wall_seconds.items()):
+            lines.append(
+                f'inventory_stage_seconds_total{{stage="{name}",clock="wall"}} '
+                f"{seconds:.6f}"
+            )
+            lines.append(
+                f'inventory_stage_seconds_total{{stage="{name}",clock="cpu"}} '
+                f"{self.stage_cpu_seconds[name]:.6f}"
+            )
+
+        lines += [
+            "# HELP inventory_forecasts_total Forecasts by outcome.",
+            "# TYPE inventory_forecasts_total counter",
+        ]
+        for outcome in (
+            "arima_fits",
+            "rolling_mean_forecasts",
+            "fit_failures",
+            "cache_hits",
+            "fast_forecasts",
+        ):
+            lines.append(
+                f'inventory_forecasts_total{{outcome="{outcome}"}} '
+                f"{self.counters[outcome]}"
+            )
+
+        slowest = sorted(
+            self.product_fit_seconds.items(),
+            key=lambda item: item[1],
+            reverse=True,
+        )[:top_products]
+        lines += [
+            "# HELP inventory_product_fit_seconds_total Model fit time "
+            "of the slowest products.",
+            "# TYPE inventory_product_fit_seconds_total counter",
+        ]
+        for product_id, seconds in slowest:
+            lines.append(
+                f'inventory_product_fit_seconds_total{{product_id="{product_id}"}} '
+                f"{seconds:.6f}"
+            )
+
+        return "\n".join(lines) + "\n"
+
+
+def stage(instruments: Optional[Instrumentation], name: str):
+    """
+    instruments.stage(name), or a shared no-op context when disabled.
+    """
+    if instruments is None:
+        return _NO_STAGE
+    return instruments.stage(name)
@@ -0,0 +1,108 @@
+# simulation/catalog.py
+
+import csv
+import json
+from dataclasses import MISSING, fields
+from pathlib import Path
+from typing import Dict, Optional, Union, get_args
+
+import numpy as np
+
+from state.system_state import SystemState, ProductState
+
+
+def _product_from_row(row: dict) -> ProductState:
+    """
+    Builds a ProductState from a mapping of field name -> raw value,
+    casting each value to the field's declared type. Fields with a
+    default may be missing or empty.
+    """
+    values = {}
+    for f in fields(ProductState):
+        if f.default is not MISSING and row.get(f.name) in (None, ""):
+            continue
+        if f.name not in row:
+            raise ValueError(
+                f"Catalog row is missing '{f.name}': {row}"
+            )
+        # Optional[X] casts with X
+        cast = next(
+            (t for t in get_args(f.type) if t is not type(None)),
+            f.type,
+        )
+        values[f.name] = cast(row[f.name])
+    return ProductState(**values)
+
+
+def load_catalog(path: Union[str, Path]) -> Dict[str, ProductState]:
+    """
+    Reads a product catalog from a .csv file (one product per row,
+    ProductState field names as header) or a .json file (a list of
+    objects with the same keys).
+    """
+
+    path = Path(path)
+
+    if path.suffix.lower() == ".json":
+        with open(path) as fh:
+            rows = json.load(fh)
+    else:
+        with open(path, newline="") as fh:
+            rows = list(csv.DictReader(fh))
+
+    products = {}
+    for row in rows:
+        product = _product_from_row(row)
+        if product.product_id in products:
+            raise ValueError(
+                f"Duplicate product_id in catalog: {product.product_id}"
+            )
+        products[product.product_id] = product
+
+    return products
+
+
+def build_state(
+    products: Dict[str, ProductState],
+    seed: Optional[int] = None,
+) -> SystemState:
+    """
+    Fresh SystemState for a catalog, with a seeded demand RNG.
+    """
+    return SystemState(
+        products=products,
+        rng=np.random.default_rng(seed),
+    )
+
+
+def synthetic_catalog(
+    n_products: int,
+    seed: Optional[int] = 0,
+) -> Dict[str, ProductState]:
+    """
+    Reproducible random catalog for benchmarks and batch experiments.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    base = rng.uniform(1.0, 40.0, n_products)
+    lead_time = rng.integers(1, 8, n_products)
+
+    products = {}
+    for i in range(n_products):
+        product_id = f"SKU{i:06d}"
+        products[product_id] = ProductState(
+            product_id=product_id,
+            name=f"Product {i}",
+            price=float(rng.uniform(5.0, 100.0)),
+            current_stock=int(base[i] * lead_time[i] * 2),
+            base_demand=float(base[i]),
+            trend_slope=float(rng.normal(0.0, 0.02)),
+            seasonality_amplitude=float(rng.uniform(0.0, 0.3) * base[i]),
+            lead_time=int(lead_time[i]),
+            min_order_qty=int(rng.integers(1, 10) * 10),
+            holding_cost=float(rng.uniform(0.1, 3.0)),
+            stockout_cost=float(rng.uniform(2.0, 20.0)),
+        )
+
+    return products
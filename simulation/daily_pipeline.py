@@ -1,19 +1,195 @@
 # simulation/daily_pipeline.py
 
+from concurrent.futures import Executor
+from typing import Optional
+
+import numpy as np
+
+from config import PipelineConfig
 from state.system_state import SystemState
-from simulation.engine import advance_one_day
-from ai.forecasting import update_forecasts
+from simulation.engine import advance_one_day, advance_block
+from ai.forecasting import update_forecasts, score_forecasts
+from ai.forecast_cache import ForecastCache
+from ai.background import BackgroundForecaster
 from ai.recommender import recommend_reorders
+from monitoring.instrumentation import Instrumentation, stage
 
 
-def run_daily_cycle(state: SystemState) -> None:
+def run_daily_cycle(
+    state: SystemState,
+    config: Optional[PipelineConfig] = None,
+    executor: Optional[Executor] = None,
+    instruments: Optional[Instrumentation] = None,
+    cache: Optional[ForecastCache] = None,
+    forecaster: Optional[BackgroundForecaster] = None,
+    demand: Optional[np.ndarray] = None,
+) -> None:
     """
     Executes one full business day cycle:
     - Advance simulation
+    - Score yesterday's forecasts against today's demand
     - Update forecasts
     - Generate reorder recommendations
+
+    Pass an Instrumentation to record per-stage timings and model
+    fit statistics for the day, and a ForecastCache to reuse model
+    forecasts for demand windows that were already fitted.
+
+    With a BackgroundForecaster, the day's demand and model fits were
+    prepared at the end of the previous cycle; fits that overrun their
+    budget fall back to the rolling mean. Tomorrow's fits are
+    submitted before returning.
+
+    `demand` (aligned with state.products) replays the day's observed
+    demand, e.g. from simulation.ingestion, instead of drawing it.
+    A BackgroundForecaster always draws its own, so the two are
+    exclusive.
     """
 
-    advance_one_day(state)
-    update_forecasts(state)
-    recommend_reorders(state)
+    if forecaster is not None and demand is not None:
+        raise ValueError("demand cannot be supplied with a forecaster")
+
+    if config is None:
+        config = PipelineConfig()
+
+    if instruments is not None:
+        instruments.begin_day(state.day + 1)
+
+    if forecaster is not None:
+        with stage(instruments, "advance_one_day"):
+            advance_one_day(state, forecaster.take_demand(state))
+
+        with stage(instruments, "score_forecasts"):
+            score_forecasts(state)
+
+        with stage(instruments, "update_forecasts"):
+            forecaster.update_forecasts(state, instruments)
+
+        with stage(instruments, "recommend_reorders"):
+            recommend_reorders(
+                state,
+                safety_factor=config.safety_factor,
+                vectorized=config.vectorized_recommender,
+                safety_factors=config.safety_factors,
+            )
+
+        if instruments is not None:
+            instruments.end_day()
+
+        forecaster.prepare_next_day(state)
+        return
+
+    with stage(instruments, "advance_one_day"):
+        advance_one_day(state, demand)
+
+    with stage(instruments, "score_forecasts"):
+        score_forecasts(state)
+
+    with stage(instruments, "update_forecasts"):
+        update_forecasts(
+            state,
+            horizon=config.horizon,
+            window=config.window,
+            warmup=config.warmup,
+            incremental=config.incremental,
+            refit_every=config.refit_every,
+            drift_threshold=config.drift_threshold,
+            workers=config.workers,
+            executor=executor,
+            instruments=instruments,
+            cache=cache,
+            tiered=config.tiered,
+            arima_threshold=config.arima_threshold,
+            hierarchy=config.hierarchy,
+        )
+
+    with stage(instruments, "recommend_reorders"):
+        recommend_reorders(
+            state,
+            safety_factor=config.safety_factor,
+            vectorized=config.vectorized_recommender,
+            safety_factors=config.safety_factors,
+        )
+
+    if instruments is not None:
+        instruments.end_day()
+
+
+def advance_days(
+    state: SystemState,
+    n: int,
+    forecast_every: int = 1,
+    config: Optional[PipelineConfig] = None,
+    executor: Optional[Executor] = None,
+    instruments: Optional[Instrumentation] = None,
+    cache: Optional[ForecastCache] = None,
+    demand: Optional[np.ndarray] = None,
+) -> None:
+    """
+    Fast-forwards the simulation by `n` days.
+
+    Inventory dynamics run in blocks of `forecast_every` days through
+    advance_block; forecasts and recommendations are refreshed only at
+    the end of each block (and therefore always after the last day).
+    With forecast_every=1 this matches n run_daily_cycle calls, except
+    that cost totals agree only up to float rounding (see
+    advance_block).
+
+    `demand` is an optional (n, n_products) block of observed demand.
+    """
+
+    if config is None:
+        config = PipelineConfig()
+
+    if forecast_every < 1:
+        raise ValueError("forecast_every must be at least 1")
+
+    remaining = n
+
+    while remaining > 0:
+        block = min(forecast_every, remaining)
+
+        if instruments is not None:
+            instruments.begin_day(state.day + block)
+
+        with stage(instruments, "advance_block"):
+            done = n - remaining
+            advance_block(
+                state,
+                block,
+                None if demand is None else demand[done:done + block],
+            )
+
+        with stage(instruments, "score_forecasts"):
+            score_forecasts(state, days=block)
+
+        with stage(instruments, "update_forecasts"):
+            update_forecasts(
+                state,
+                horizon=config.horizon,
+                window=config.window,
+                warmup=config.warmup,
+                incremental=config.incremental,
+                refit_every=config.refit_every,
+                drift_threshold=config.drift_threshold,
+                workers=config.workers,
+                executor=executor,
+                instruments=instruments,
+                cache=cache,
+                tiered=config.tiered,
+                arima_threshold=config.arima_threshold,
+                hierarchy=config.hierarchy,
+            )
+
+        with stage(instruments, "recommend_reorders"):
+            recommend_reorders(
+                state,
+                safety_factor=config.safety_factor,
+                vectorized=config.vectorized_recommender,
+                safety_factors=config.safety_factors,
+            )
+
+        if instruments is not None:
+            instruments.end_day()
+
+        remaining -= block
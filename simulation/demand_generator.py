@@ -1,8 +1,9 @@
 import numpy as np
 import math
 import random
+from dataclasses import dataclass
+from typing import Iterable, Union
 from state.system_state import ProductState
-import matplotlib.pyplot as plt
 
 def generate_daily_demand(
     product: ProductState,
@@ -29,7 +30,69 @@ def generate_daily_demand(
 
     return int(demand)
 
+@dataclass
+class DemandParams:
+    """
+    Demand-model parameters of many products, one array entry each.
+    """
+    base_demand: np.ndarray
+    trend_slope: np.ndarray
+    seasonality_amplitude: np.ndarray
+
+
+def demand_params(products: Iterable[ProductState]) -> DemandParams:
+    products = list(products)
+    return DemandParams(
+        base_demand=np.array(
+            [p.base_demand for p in products], dtype=float
+        ),
+        trend_slope=np.array(
+            [p.trend_slope for p in products], dtype=float
+        ),
+        seasonality_amplitude=np.array(
+            [p.seasonality_amplitude for p in products], dtype=float
+        ),
+    )
+
+
+def generate_demand_batch(
+    params: DemandParams,
+    days: Union[int, np.ndarray],
+    rng: np.random.Generator,
+    event_probability: float = 0.008,
+    event_boost: float = 8.0,
+) -> np.ndarray:
+    """
+    Vectorized generate_daily_demand for all products at once.
+
+    Same model (trend + seasonality + random events + Poisson noise),
+    evaluated with array operations and a single Poisson draw.
+
+    A scalar `days` returns shape (n_products,); an array of days
+    returns shape (n_days, n_products).
+    """
+
+    day_arr = np.asarray(days, dtype=float)
+    t = day_arr[..., None]
+
+    base = params.base_demand
+    trend = params.trend_slope * t
+    seasonality = (
+        params.seasonality_amplitude * np.sin(2 * np.pi * t / 7)
+    )
+
+    shape = np.broadcast_shapes(t.shape, base.shape)
+    prob = rng.random(shape)
+
+    event = np.where(prob < event_probability, event_boost * prob, 0.0)
+    lambda_t = np.maximum(base + trend + seasonality + event, 0.0)
+
+    return rng.poisson(lambda_t)
+
+
 """
+import matplotlib.pyplot as plt
+
 product = ProductState(
     product_id="A101",
     name="Milk",
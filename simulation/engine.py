@@ -1,20 +1,44 @@
 # simulation/engine.py
 
-from state.system_state import (
-    SystemState,
-    SalesRecord,
-    DemandRecord,
-    PendingOrder,
-)
-from simulation.demand_generator import generate_daily_demand
+from typing import Optional
 
+import numpy as np
 
-def advance_one_day(state: SystemState) -> None:
+from state.system_state import SystemState
+from state.history_store import DEMAND, SALES
+from simulation.demand_generator import demand_params, generate_demand_batch
+
+
+def draw_demand(state: SystemState, day: int) -> np.ndarray:
+    """
+    True demand of every product on `day`, in state.products order,
+    drawn from state.rng.
+    """
+    return generate_demand_batch(
+        demand_params(state.products.values()),
+        day,
+        state.rng,
+    )
+
+
+def advance_one_day(
+    state: SystemState,
+    demand: Optional[np.ndarray] = None,
+) -> None:
     """
     Advances the simulation by exactly one day.
     Mutates the SystemState in-place.
+
+    `demand` supplies the day's true demand (aligned with
+    state.products) instead of drawing it from the generator.
     """
 
+    if demand is not None and len(demand) != len(state.products):
+        raise ValueError(
+            f"Expected demand for {len(state.products)} products, "
+            f"got {len(demand)}"
+        )
+
     # =====================================================
     # 1. Advance simulation clock
     # =====================================================
@@ -24,19 +48,16 @@ def advance_one_day(state: SystemState) -> None:
     # =====================================================
     # 2. Realize demand & update inventory
     # =====================================================
-    for product_id, product in state.products.items():
+    # -------- TRUE DEMAND (all products, one draw) --------
+    if demand is None:
+        demand = draw_demand(state, today)
+
+    demands = np.asarray(demand).tolist()
 
-        # -------- TRUE DEMAND --------
-        demand = generate_daily_demand(product, today)
+    for (product_id, product), demand in zip(state.products.items(), demands):
 
         # Log TRUE demand (never clipped)
-        state.demand_history.append(
-            DemandRecord(
-                day=today,
-                product_id=product_id,
-                demand=demand,
-            )
-        )
+        state.history.append(DEMAND, product_id, today, demand)
 
         # -------- SALES --------
         actual_sales = min(demand, product.current_stock)
@@ -44,13 +65,7 @@ def advance_one_day(state: SystemState) -> None:
 
         product.current_stock -= actual_sales
 
-        state.sales_history.append(
-            SalesRecord(
-                day=today,
-                product_id=product_id,
-                units_sold=actual_sales,
-            )
-        )
+        state.history.append(SALES, product_id, today, actual_sales)
 
         # -------- STOCKOUT COST --------
         if unmet_demand > 0:
@@ -71,12 +86,100 @@ def advance_one_day(state: SystemState) -> None:
     # =====================================================
     # 3. Process arriving orders
     # =====================================================
-    delivered = []
+    for order in state.pending_orders.pop_due(today):
+        state.products[order.product_id].current_stock += order.quantity
+
+
+def advance_block(
+    state: SystemState,
+    n_days: int,
+    demand: Optional[np.ndarray] = None,
+) -> None:
+    """
+    Advances the simulation by `n_days` days with the same dynamics as
+    advance_one_day, but with inventory, sales and costs held in
+    arrays across all products.
+
+    Demand is drawn day by day from state.rng exactly as
+    advance_one_day draws it, so the random stream is identical. Each
+    day's arrivals are applied in one scatter-add. Histories are
+    written once per product for the whole block.
+
+    Stock, sales, histories and stockout days match advance_one_day
+    exactly. Cost totals are summed per day as arrays rather than
+    product by product, so they agree only up to float rounding.
+
+    `demand`, an (n_days, n_products) array aligned with
+    state.products, replaces the generator draws.
+    """
+
+    if n_days <= 0:
+        return
+
+    if demand is not None and np.shape(demand) != (n_days, len(state.products)):
+        raise ValueError(
+            f"Expected a ({n_days}, {len(state.products)}) demand block, "
+            f"got {np.shape(demand)}"
+        )
+
+    product_ids = list(state.products)
+    products = list(state.products.values())
+    index = {product_id: i for i, product_id in enumerate(product_ids)}
+
+    params = demand_params(products)
+    stock = np.array([p.current_stock for p in products], dtype=np.int64)
+    holding_cost = np.array([p.holding_cost for p in products], dtype=float)
+    stockout_cost = np.array([p.stockout_cost for p in products], dtype=float)
+    price = np.array([p.price for p in products], dtype=float)
+
+    n = len(products)
+    days = np.arange(state.day + 1, state.day + n_days + 1)
+    demand_block = np.empty((n_days, n), dtype=np.int64)
+    sales_block = np.empty((n_days, n), dtype=np.int64)
+
+    metrics = state.metrics
+
+    for i, today in enumerate(days.tolist()):
+        state.day = today
+
+        # -------- TRUE DEMAND & SALES --------
+        if demand is None:
+            demand_block[i] = generate_demand_batch(params, today, state.rng)
+        else:
+            demand_block[i] = demand[i]
 
-    for order in state.pending_orders:
-        if order.arrival_day == today:
-            state.products[order.product_id].current_stock += order.quantity
-            delivered.append(order)
+        sales = np.minimum(demand_block[i], stock)
+        unmet = demand_block[i] - sales
+        stock -= sales
+
+        sales_block[i] = sales
+
+        # -------- STOCKOUT COST --------
+        short = unmet > 0
+        if short.any():
+            metrics.stockout_days += int(short.sum())
+            metrics.total_stockout_cost += float(
+                (unmet * stockout_cost).sum()
+            )
+            metrics.total_understocking_cost += float(
+                (unmet * price).sum()
+            )
+
+        # -------- HOLDING COST --------
+        metrics.total_holding_cost += float(
+            (np.maximum(stock, 0) * holding_cost).sum()
+        )
+
+        # -------- ARRIVALS --------
+        arrivals = state.pending_orders.pop_due(today)
+        if arrivals:
+            np.add.at(
+                stock,
+                [index[order.product_id] for order in arrivals],
+                [order.quantity for order in arrivals],
+            )
 
-    for order in delivered:
-        state.pending_orders.remove(order)
+    for j, (product_id, product) in enumerate(state.products.items()):
+        product.current_stock = int(stock[j])
+        state.history.extend(DEMAND, product_id, days, demand_block[:, j])
+        state.history.extend(SALES, product_id, days, sales_block[:, j])
@@ -0,0 +1,209 @@
+# simulation/ingestion.py
+"""
+Streaming ingestion of point-of-sale event logs.
+
+Reads a transaction export (.csv or JSON lines, one row per
+transaction) in bounded-size chunks and aggregates it to per-product
+daily demand. Only the (days x products) demand matrix is kept in
+memory, so memory use depends on the catalog and the time span (see
+max_day), never on the file size.
+"""
+
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+
+class DemandFeed:
+    """
+    Aggregated daily demand, one column per product, days starting at 1.
+    """
+
+    def __init__(self, product_ids: Sequence[str], matrix: np.ndarray) -> None:
+        self.product_ids = list(product_ids)
+        self.matrix = matrix
+        self._column = {pid: j for j, pid in enumerate(self.product_ids)}
+
+        self.rows_read = 0
+        self.rows_dropped = 0
+
+    @property
+    def last_day(self) -> int:
+        return len(self.matrix)
+
+    def demand_for_day(
+        self,
+        day: int,
+        product_ids: Optional[Sequence[str]] = None,
+    ) -> np.ndarray:
+        """
+        Demand on `day` for product_ids (default: the feed's own order);
+        products or days outside the feed have zero demand.
+        """
+        return self.demand_for_days(np.array([day]), product_ids)[0]
+
+    def demand_for_days(
+        self,
+        days: np.ndarray,
+        product_ids: Optional[Sequence[str]] = None,
+    ) -> np.ndarray:
+        """
+        (len(days), len(product_ids)) block of demand.
+        """
+
+        days = np.asarray(days)
+        if product_ids is None:
+            columns = np.arange(len(self.product_ids))
+        else:
+            columns = np.array(
+                [self._column.get(pid, -1) for pid in product_ids],
+                dtype=np.int64,
+            )
+
+        block = np.zeros((len(days), len(columns)), dtype=np.int64)
+        in_range = (days >= 1) & (days <= self.last_day)
+        known = columns >= 0
+        block[np.ix_(in_range, known)] = self.matrix[
+            np.ix_(days[in_range] - 1, columns[known])
+        ]
+        return block
+
+
+def _read_chunks(
+    path: Path,
+    columns: List[str],
+    chunk_rows: int,
+    product_column: str,
+) -> Iterator:
+
+    import pandas as pd
+
+    suffix = path.suffix.lower()
+
+    # Product ids stay strings, so "007" is not read as 7
+    dtype = {product_column: str}
+
+    if suffix in (".jsonl", ".ndjson"):
+        reader = pd.read_json(
+            path,
+            lines=True,
+            chunksize=chunk_rows,
+            dtype=dtype,
+        )
+        for chunk in reader:
+            yield chunk[columns]
+    elif suffix == ".json":
+        # A JSON array cannot be read in chunks
+        raise ValueError(
+            f"{path}: event logs must be JSON lines (.jsonl), "
+            f"one object per line"
+        )
+    else:
+        yield from pd.read_csv(
+            path,
+            usecols=columns,
+            chunksize=chunk_rows,
+            dtype=dtype,
+        )
+
+
+def ingest_events(
+    path: Union[str, Path],
+    product_ids: Sequence[str],
+    chunk_rows: int = 500_000,
+    product_column: str = "product_id",
+    day_column: Optional[str] = "day",
+    date_column: Optional[str] = None,
+    start_date: Optional[str] = None,
+    quantity_column: Optional[str] = "quantity",
+    max_day: Optional[int] = None,
+) -> DemandFeed:
+    """
+    Aggregates a transaction log to daily demand per product.
+
+    Days come either from an integer `day_column` (day 1 = first
+    simulated day) or from a `date_column` of timestamps, with
+    `start_date` as day 1. The file is never read twice, so
+    start_date cannot be inferred and is required with date_column.
+
+    Each row adds `quantity_column` units, or 1 if it is None.
+    Rows for products outside `product_ids`, before day 1 or after
+    `max_day` are dropped and counted in DemandFeed.rows_dropped.
+    The feed holds a dense (days x products) matrix, so pass max_day
+    (e.g. the last simulated day) unless the log is trusted; a single
+    far-off timestamp would otherwise size the matrix.
+    """
+
+    import pandas as pd
+
+    path = Path(path)
+
+    if date_column is not None:
+        if start_date is None:
+            raise ValueError("start_date is required with date_column")
+        origin = pd.Timestamp(start_date).normalize()
+        time_column = date_column
+    elif day_column is not None:
+        time_column = day_column
+    else:
+        raise ValueError("Either day_column or date_column is required")
+
+    columns = [product_column, time_column]
+    if quantity_column is not None:
+        columns.append(quantity_column)
+
+    catalog = pd.Index(product_ids)
+    n = len(catalog)
+
+    matrix = np.zeros((0, n), dtype=np.int64)
+    rows_read = 0
+    rows_dropped = 0
+
+    for chunk in _read_chunks(path, columns, chunk_rows, product_column):
+        rows_read += len(chunk)
+
+        col = catalog.get_indexer(chunk[product_column].astype(str))
+
+        if date_column is not None:
+            stamps = pd.to_datetime(chunk[date_column]).dt.normalize()
+            day = ((stamps - origin).dt.days + 1).to_numpy()
+        else:
+            day = chunk[day_column].to_numpy(dtype=np.int64)
+
+        if quantity_column is not None:
+            qty = chunk[quantity_column].to_numpy(dtype=np.int64)
+        else:
+            qty = np.ones(len(chunk), dtype=np.int64)
+
+        keep = (col >= 0) & (day >= 1)
+        if max_day is not None:
+            keep &= day <= max_day
+        rows_dropped += int((~keep).sum())
+        if not keep.any():
+            continue
+
+        col, day, qty = col[keep], day[keep], qty[keep]
+
+        chunk_last = int(day.max())
+        if chunk_last > len(matrix):
+            grown = np.zeros(
+                (max(chunk_last, 2 * len(matrix)), n),
+                dtype=np.int64,
+            )
+            grown[:len(matrix)] = matrix
+            matrix = grown
+
+        # Sum the chunk per (day, product) cell, then add the cells
+        cells, inverse = np.unique((day - 1) * n + col, return_inverse=True)
+        totals = np.bincount(inverse, weights=qty).astype(np.int64)
+        matrix.reshape(-1)[cells] += totals
+
+    # Trim the growth slack back to the last day with any event
+    nonzero_days = np.flatnonzero(matrix.any(axis=1))
+    last = int(nonzero_days[-1]) + 1 if len(nonzero_days) else 0
+
+    feed = DemandFeed(catalog.tolist(), matrix[:last].copy())
+    feed.rows_read = rows_read
+    feed.rows_dropped = rows_dropped
+    return feed
@@ -0,0 +1,206 @@
+# simulation/monte_carlo.py
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from state.system_state import ProductState
+from simulation.demand_generator import DemandParams, generate_demand_batch
+
+
+@dataclass
+class MonteCarloResult:
+    """
+    Per-replication totals, one array entry per replication.
+    """
+    holding_cost: np.ndarray
+    stockout_cost: np.ndarray
+    understocking_cost: np.ndarray
+    stockout_days: np.ndarray
+
+    def summary(
+        self,
+        quantiles: Sequence[float] = (0.05, 0.5, 0.95),
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Mean and quantiles of every cost / stockout distribution.
+        """
+        out = {}
+        for name in (
+            "holding_cost",
+            "stockout_cost",
+            "understocking_cost",
+            "stockout_days",
+        ):
+            values = getattr(self, name)
+            stats = {"mean": float(values.mean())}
+            for q, v in zip(quantiles, np.quantile(values, quantiles)):
+                stats[f"q{round(q * 100):02d}"] = float(v)
+            out[name] = stats
+        return out
+
+
+def expected_lead_time_demand(
+    product: ProductState,
+    days: np.ndarray,
+) -> np.ndarray:
+    """
+    Noise-free demand over the lead time following each day in `days`
+    (trend + seasonality, events ignored). Stands in for the forecast
+    the recommender would see.
+    """
+    t = days[:, None] + np.arange(1, product.lead_time + 1)[None, :]
+    lam = (
+        product.base_demand
+        + product.trend_slope * t
+        + product.seasonality_amplitude * np.sin(2 * np.pi * t / 7)
+    )
+    return np.maximum(lam, 0.0).sum(axis=1)
+
+
+def demand_paths(
+    product: ProductState,
+    n_days: int,
+    n_replications: int,
+    start_day: int = 0,
+    seed=None,
+) -> np.ndarray:
+    """
+    (n_days, n_replications) block of demand for one product, drawn
+    in the same order simulate_replications draws it. Passing the block
+    back as `demand` evaluates several policies on common random
+    numbers.
+    """
+
+    rng = np.random.default_rng(seed)
+    R = n_replications
+
+    params = DemandParams(
+        base_demand=np.full(R, float(product.base_demand)),
+        trend_slope=np.full(R, float(product.trend_slope)),
+        seasonality_amplitude=np.full(
+            R, float(product.seasonality_amplitude)
+        ),
+    )
+
+    block = np.empty((n_days, R), dtype=np.int64)
+    for i in range(n_days):
+        block[i] = generate_demand_batch(params, start_day + 1 + i, rng)
+    return block
+
+
+def simulate_replications(
+    product: ProductState,
+    n_days: int,
+    n_replications: int = 1000,
+    safety_factor: float = 0.3,
+    reorder_point: Optional[float] = None,
+    start_day: int = 0,
+    initial_stock: Optional[int] = None,
+    seed: Optional[int] = None,
+    demand: Optional[np.ndarray] = None,
+) -> MonteCarloResult:
+    """
+    Simulates many independent replications of one product's
+    inventory, all replications advancing together as arrays.
+
+    Each day follows simulation.engine.advance_one_day: demand is
+    realized, sales and costs are booked, then orders due that day
+    arrive. Afterwards the recommender's policy is applied. If the
+    inventory position (stock plus orders still on the way) is below
+    the reorder point, an order of max(ceil(reorder point - position),
+    min_order_qty) is placed. Like order_processor.place_order, it
+    arrives lead_time days later.
+
+    The reorder point is (1 + safety_factor) times the expected
+    lead-time demand, unless a fixed `reorder_point` is given.
+
+    `demand` may be a pre-drawn (n_days, n_replications) block, so
+    several policies can be compared on identical demand paths.
+    """
+
+    rng = np.random.default_rng(seed)
+    R = n_replications
+    L = product.lead_time
+
+    days = np.arange(start_day + 1, start_day + n_days + 1)
+
+    if reorder_point is None:
+        reorder_points = (
+            (1 + safety_factor) * expected_lead_time_demand(product, days)
+        )
+    else:
+        reorder_points = np.full(n_days, float(reorder_point))
+
+    if demand is not None and demand.shape != (n_days, R):
+        raise ValueError(
+            f"demand must have shape {(n_days, R)}, got {demand.shape}"
+        )
+
+    params = DemandParams(
+        base_demand=np.full(R, float(product.base_demand)),
+        trend_slope=np.full(R, float(product.trend_slope)),
+        seasonality_amplitude=np.full(
+            R, float(product.seasonality_amplitude)
+        ),
+    )
+
+    stock = np.full(
+        R,
+        product.current_stock if initial_stock is None else initial_stock,
+        dtype=np.int64,
+    )
+
+    # Ring buffer of arrivals: slot d % (L + 1) holds what lands on day d
+    pipeline = np.zeros((L + 1, R), dtype=np.int64)
+
+    holding = np.zeros(R)
+    stockout_cost = np.zeros(R)
+    understocking = np.zeros(R)
+    stockout_days = np.zeros(R, dtype=np.int64)
+
+    for i, day in enumerate(days):
+
+        # -------- TRUE DEMAND --------
+        if demand is None:
+            today_demand = generate_demand_batch(params, day, rng)
+        else:
+            today_demand = demand[i]
+
+        # -------- SALES --------
+        sales = np.minimum(today_demand, stock)
+        unmet = today_demand - sales
+        stock -= sales
+
+        # -------- STOCKOUT COST --------
+        short = unmet > 0
+        stockout_days += short
+        stockout_cost += unmet * product.stockout_cost
+        understocking += unmet * product.price
+
+        # -------- HOLDING COST --------
+        holding += np.maximum(stock, 0) * product.holding_cost
+
+        # -------- ARRIVALS --------
+        slot = day % (L + 1)
+        stock += pipeline[slot]
+        pipeline[slot] = 0
+
+        # -------- REORDER POLICY --------
+        rp = reorder_points[i]
+        position = stock + pipeline.sum(axis=0)
+        reorder = position < rp
+        if reorder.any():
+            qty = np.maximum(
+                np.ceil(rp - position).astype(np.int64),
+                product.min_order_qty,
+            )
+            pipeline[(day + L) % (L + 1)] += np.where(reorder, qty, 0)
+
+    return MonteCarloResult(
+        holding_cost=holding,
+        stockout_cost=stockout_cost,
+        understocking_cost=understocking,
+        stockout_days=stockout_days,
+    )
@@ -1,5 +1,9 @@
 # simulation/order_processor.py
 
+from typing import List, Sequence
+
+import numpy as np
+
 from state.system_state import (
     SystemState,
     PendingOrder,
@@ -17,7 +21,7 @@ def place_order(
     This function:
     - Creates a PendingOrder
     - Respects product lead time
-    - Appends the order to state.pending_orders
+    - Adds the order to state.pending_orders
 
     It does NOT:
     - Modify inventory immediately
@@ -36,7 +40,7 @@ def place_order(
     order_day = state.day
     arrival_day = order_day + product.lead_time
 
-    order_id = len(state.pending_orders) + 1
+    order_id = state.pending_orders.next_order_id()
 
     pending_order = PendingOrder(
         order_id=order_id,
@@ -46,4 +50,54 @@ def place_order(
         arrival_day=arrival_day,
     )
 
-    state.pending_orders.append(pending_order)
+    state.pending_orders.add(pending_order)
+
+
+def place_orders(
+    state: SystemState,
+    product_ids: Sequence[str],
+    quantities: Sequence[int],
+) -> List[int]:
+    """
+    Places many orders at once, with the same rules as place_order.
+
+    Entries with a non-positive quantity or an unknown product are
+    ignored. Everything else is validated in one pass, gets a block of
+    consecutive order ids, and is added to the order book in one batch.
+
+    Returns the ids of the orders placed, in input order.
+    """
+
+    if len(product_ids) != len(quantities):
+        raise ValueError(
+            f"Got {len(product_ids)} product ids "
+            f"but {len(quantities)} quantities"
+        )
+
+    quantities = np.asarray(quantities, dtype=np.int64)
+    products = state.products
+
+    valid = [
+        i for i in np.flatnonzero(quantities > 0).tolist()
+        if product_ids[i] in products
+    ]
+    if not valid:
+        return []
+
+    order_day = state.day
+    order_ids = state.pending_orders.reserve_ids(len(valid))
+    qty = quantities.tolist()
+
+    orders = [
+        PendingOrder(
+            order_id=order_id,
+            product_id=product_ids[i],
+            quantity=qty[i],
+            order_day=order_day,
+            arrival_day=order_day + products[product_ids[i]].lead_time,
+        )
+        for order_id, i in zip(order_ids, valid)
+    ]
+
+    state.pending_orders.add_many(orders)
+    return list(order_ids)
@@ -0,0 +1,396 @@
+# simulation/runner.py
+"""
+Headless simulation runner.
+
+Drives run_daily_cycle for many days without the Streamlit UI:
+
+    python -m simulation.runner catalog.csv --days 365 --seed 7
+"""
+
+import argparse
+import json
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from config import PipelineConfig
+from state.system_state import SystemState, Metrics
+from state.checkpoint import SnapshotWriter, load_snapshot
+from state.history_archive import HistoryArchive
+from simulation.catalog import load_catalog, build_state
+from simulation.daily_pipeline import run_daily_cycle, advance_days
+from simulation.ingestion import DemandFeed, ingest_events
+from simulation.sharding import run_sharded
+from monitoring.instrumentation import Instrumentation
+from ai.forecast_cache import ForecastCache
+from ai.model_pool import shared_pool
+from ai.policy_optimizer import PolicyTable
+
+
+@dataclass
+class RunReport:
+    days: int
+    products: int
+    elapsed_seconds: float
+    days_per_sec: float
+    products_per_sec: float
+    final_day: int
+    metrics: Metrics
+
+
+def run_simulation(
+    state: SystemState,
+    days: int,
+    config: Optional[PipelineConfig] = None,
+    checkpoint_every: int = 0,
+    checkpoint_path: Optional[Union[str, Path]] = None,
+    instruments: Optional[Instrumentation] = None,
+    cache: Optional[ForecastCache] = None,
+    forecast_every: int = 1,
+    demand_feed: Optional[DemandFeed] = None,
+) -> RunReport:
+    """
+    Runs `days` full daily cycles on `state` (mutated in place) and
+    reports throughput. Product-days per second is reported as
+    products_per_sec.
+
+    With forecast_every > 1 the run fast-forwards through
+    advance_days, refreshing forecasts only every that many days.
+
+    With a demand_feed, each day's demand is replayed from the
+    ingested event log instead of drawn from the generator.
+
+    With checkpoint_every > 0 the state is snapshotted to the
+    checkpoint_path directory every that many days and once more at
+    the end. After the first full snapshot only new history rows are
+    appended (see state.checkpoint.SnapshotWriter).
+    """
+
+    if config is None:
+        config = PipelineConfig()
+
+    if checkpoint_every > 0 and checkpoint_path is None:
+        raise ValueError("checkpoint_every requires a checkpoint_path")
+
+    writer = (
+        SnapshotWriter(checkpoint_path) if checkpoint_every > 0 else None
+    )
+
+    # One warm pool for the whole run (and any later run in this
+    # process) instead of one per day
+    executor = shared_pool(config.workers) if config.workers > 1 else None
+
+    start = time.perf_counter()
+
+    done = 0
+    while done < days:
+        step = min(forecast_every, days - done)
+
+        demand = None
+        if demand_feed is not None:
+            demand = demand_feed.demand_for_days(
+                np.arange(state.day + 1, state.day + step + 1),
+                list(state.products),
+            )
+
+        if step == 1:
+            run_daily_cycle(
+                state,
+                config,
+                executor,
+                instruments,
+                cache,
+                demand=None if demand is None else demand[0],
+            )
+        else:
+            advance_days(
+                state,
+                step,
+                forecast_every=step,
+                config=config,
+                executor=executor,
+                instruments=instruments,
+                cache=cache,
+                demand=demand,
+            )
+
+        # Checkpoint whenever a multiple of checkpoint_every is passed
+        if (
+            checkpoint_every > 0
+            and (done + step) // checkpoint_every > done // checkpoint_every
+        ):
+            writer.write(state)
+
+        done += step
+
+    elapsed = time.perf_counter() - start
+
+    if writer is not None and days % checkpoint_every != 0:
+        writer.write(state)
+
+    if state.history.archive is not None:
+        state.history.archive.flush()
+
+    n_products = len(state.products)
+    rate = days / elapsed if elapsed > 0 else float("inf")
+
+    return RunReport(
+        days=days,
+        products=n_products,
+        elapsed_seconds=elapsed,
+        days_per_sec=rate,
+        products_per_sec=rate * n_products,
+        final_day=state.day,
+        metrics=state.metrics,
+    )
+
+
+# ======================================================
+# CLI
+# ======================================================
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run the inventory simulation without the UI.",
+    )
+    parser.add_argument(
+        "catalog",
+        nargs="?",
+        help="Product catalog (.csv or .json)",
+    )
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--resume",
+        metavar="PATH",
+        help="Continue from a checkpoint instead of the catalog",
+    )
+    parser.add_argument(
+        "--demand-log",
+        metavar="PATH",
+        help="Replay demand from a POS event log (.csv or .jsonl)",
+    )
+    parser.add_argument(
+        "--date-column",
+        default=None,
+        help="Timestamp column of the event log (default: integer 'day')",
+    )
+    parser.add_argument(
+        "--start-date",
+        default=None,
+        help="Date that maps to simulation day 1 (with --date-column)",
+    )
+    parser.add_argument(
+        "--quantity-column",
+        default="quantity",
+        help="Units column of the event log; 'none' counts rows",
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Split the catalog over N simulation processes",
+    )
+    parser.add_argument(
+        "--forecast-every",
+        type=int,
+        default=1,
+        help="Refresh forecasts only every N days (fast-forward)",
+    )
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--refit-every", type=int, default=7)
+    parser.add_argument(
+        "--tiered",
+        action="store_true",
+        help="Forecast with cheap models first; ARIMA + GARCH only if needed",
+    )
+    parser.add_argument("--arima-threshold", type=float, default=0.35)
+    parser.add_argument(
+        "--hierarchy",
+        choices=["bottom_up", "middle_out", "top_down"],
+        default=None,
+        help="Fit models per catalog category or in total, not per product",
+    )
+    parser.add_argument("--safety-factor", type=float, default=0.3)
+    parser.add_argument(
+        "--policy",
+        metavar="PATH",
+        help="Per-product safety factors from ai.policy_optimizer",
+    )
+    parser.add_argument("--vectorized-recommender", action="store_true")
+    parser.add_argument(
+        "--hot-days",
+        type=int,
+        default=None,
+        help="Keep only this many recent days of history in memory",
+    )
+    parser.add_argument(
+        "--archive",
+        metavar="PATH",
+        help="Directory for aggregates of history beyond --hot-days",
+    )
+    parser.add_argument(
+        "--archive-period",
+        type=int,
+        default=7,
+        help="Days per archived aggregate (7 = weekly, 30 = monthly)",
+    )
+    parser.add_argument("--checkpoint-every", type=int, default=0)
+    parser.add_argument("--checkpoint-path", default=None)
+    parser.add_argument(
+        "--forecast-cache",
+        metavar="PATH",
+        help="Reuse model forecasts across runs via an on-disk cache",
+    )
+    parser.add_argument("--cache-size", type=int, default=10_000)
+    parser.add_argument(
+        "--metrics-jsonl",
+        metavar="PATH",
+        help="Write per-day stage timings and fit counts as JSON lines",
+    )
+    parser.add_argument(
+        "--metrics-prom",
+        metavar="PATH",
+        help="Write cumulative metrics in Prometheus text format",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the report as JSON",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> RunReport:
+    args = _parse_args(argv)
+
+    if args.resume:
+        state = load_snapshot(args.resume)
+    elif args.catalog is None:
+        raise SystemExit("A catalog file is required unless --resume is given")
+    else:
+        state = build_state(load_catalog(args.catalog), seed=args.seed)
+
+    demand_feed = None
+    if args.demand_log:
+        demand_feed = ingest_events(
+            args.demand_log,
+            list(state.products),
+            day_column=None if args.date_column else "day",
+            date_column=args.date_column,
+            start_date=args.start_date,
+            quantity_column=(
+                None if args.quantity_column.lower() == "none"
+                else args.quantity_column
+            ),
+            max_day=state.day + args.days,
+        )
+        if not args.json:
+            print(f"Ingested {demand_feed.rows_read} events "
+                  f"({demand_feed.rows_dropped} dropped), "
+                  f"{demand_feed.last_day} days")
+
+    config = PipelineConfig(
+        incremental=args.incremental,
+        refit_every=args.refit_every,
+        tiered=args.tiered,
+        arima_threshold=args.arima_threshold,
+        hierarchy=args.hierarchy,
+        workers=args.workers,
+        safety_factor=args.safety_factor,
+        safety_factors=PolicyTable.load(args.policy) if args.policy else None,
+        vectorized_recommender=args.vectorized_recommender,
+    )
+
+    if args.hot_days is not None and args.hot_days < config.window:
+        raise SystemExit(
+            f"--hot-days must cover the forecast window ({config.window})"
+        )
+
+    instruments = (
+        Instrumentation()
+        if args.metrics_jsonl or args.metrics_prom
+        else None
+    )
+
+    cache = (
+        ForecastCache.load(args.forecast_cache, args.cache_size)
+        if args.forecast_cache
+        else None
+    )
+
+    if args.shards > 1:
+        if args.resume or args.forecast_cache or instruments is not None:
+            raise SystemExit(
+                "--shards cannot be combined with --resume, "
+                "--forecast-cache or metrics output"
+            )
+        report = run_sharded(
+            state.products,
+            args.days,
+            args.shards,
+            seed=args.seed,
+            config=config,
+            forecast_every=args.forecast_every,
+            demand_feed=demand_feed,
+            checkpoint_every=args.checkpoint_every,
+            checkpoint_path=args.checkpoint_path,
+            hot_days=args.hot_days,
+            archive_path=args.archive,
+            archive_period=args.archive_period,
+        )
+    else:
+        if args.hot_days is not None:
+            state.history.set_retention(
+                args.hot_days,
+                HistoryArchive(args.archive, period=args.archive_period),
+            )
+        report = run_simulation(
+            state,
+            args.days,
+            config,
+            checkpoint_every=args.checkpoint_every,
+            checkpoint_path=args.checkpoint_path,
+            instruments=instruments,
+            cache=cache,
+            forecast_every=args.forecast_every,
+            demand_feed=demand_feed,
+        )
+
+    if cache is not None:
+        cache.save(args.forecast_cache)
+
+    if args.metrics_jsonl:
+        with open(args.metrics_jsonl, "w") as fh:
+            fh.write(instruments.to_json_lines())
+    if args.metrics_prom:
+        with open(args.metrics_prom, "w") as fh:
+            fh.write(instruments.to_prometheus())
+
+    if args.json:
+        print(json.dumps(asdict(report), indent=2))
+    else:
+        m = report.metrics
+        print(f"Simulated {report.days} days x {report.products} products "
+              f"in {report.elapsed_seconds:.2f}s")
+        print(f"  {report.days_per_sec:.2f} days/sec, "
+              f"{report.products_per_sec:.1f} products/sec")
+        print(f"  Final day:           {report.final_day}")
+        print(f"  Holding cost:        {m.total_holding_cost:.0f}")
+        print(f"  Stockout cost:       {m.total_stockout_cost:.0f}")
+        print(f"  Understocking cost:  {m.total_understocking_cost:.0f}")
+        print(f"  Stockout days:       {m.stockout_days}")
+        if cache is not None:
+            c = cache.stats()
+            print(f"  Forecast cache:      {c['hits']} hits, "
+                  f"{c['misses']} misses ({c['hit_rate']:.0%})")
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,480 @@
+# simulation/sharding.py
+"""
+Sharded simulation across worker processes.
+
+The catalog is split into shards by a hash of the product id. Each
+shard lives in its own long-running process, which owns a complete
+SystemState for its products (stock, history, pending orders,
+forecasts, insights) and runs the ordinary daily cycle on it. The
+coordinator only moves the clock: it tells every shard to advance,
+waits for all of them, and merges what they report back, which is
+Metrics and each shard's most at-risk products.
+
+Each shard draws demand from its own stream, spawned from the run's
+seed, so a sharded run is reproducible for a given seed and shard
+count. It does not reproduce the single-process run.
+"""
+
+import os
+import time
+import traceback
+import zlib
+from dataclasses import dataclass, fields
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from config import PipelineConfig
+from state.system_state import (
+    SystemState,
+    ProductState,
+    InventoryInsight,
+    Metrics,
+)
+from state.checkpoint import SnapshotWriter
+from state.history_archive import HistoryArchive
+from simulation.daily_pipeline import advance_days
+from simulation.order_processor import place_order
+from simulation.ingestion import DemandFeed
+from ai.model_pool import shutdown_pools
+from dashboard.ranking import RiskArrays, risk_arrays, top_k_at_risk
+
+
+# How often an idle shard checks that its coordinator is still alive
+_IDLE_CHECK_SECONDS = 1.0
+
+
+def shard_of(product_id: str, n_shards: int) -> int:
+    """
+    Shard that owns product_id; stable across runs and processes.
+    """
+    return zlib.crc32(product_id.encode()) % n_shards
+
+
+@dataclass
+class ShardReport:
+    """
+    What a shard sends back after advancing.
+    """
+    day: int
+    n_products: int
+    metrics: Metrics
+    at_risk: RiskArrays
+    orders_recommended: int
+    units_recommended: int
+
+
+# ======================================================
+# Worker side
+# ======================================================
+
+def _report(state: SystemState, top_k: int) -> ShardReport:
+    risk = risk_arrays(state.insights)
+    top = top_k_at_risk(risk, top_k)
+    rows = {pid: i for i, pid in enumerate(risk.product_ids)}
+    keep = np.array([rows[pid] for pid in top], dtype=np.int64)
+
+    quantities = [i.recommended_order_qty for i in state.insights.values()]
+
+    return ShardReport(
+        day=state.day,
+        n_products=len(state.products),
+        metrics=state.metrics,
+        at_risk=RiskArrays(
+            product_ids=top,
+            stockout_probability=risk.stockout_probability[keep],
+            expected_stockout_day=risk.expected_stockout_day[keep],
+        ),
+        orders_recommended=sum(1 for q in quantities if q > 0),
+        units_recommended=int(sum(quantities)),
+    )
+
+
+def _serve_shard(
+    conn,
+    products: Dict[str, ProductState],
+    seed: np.random.SeedSequence,
+    config: PipelineConfig,
+    top_k: int,
+    checkpoint_path: Optional[str],
+    retention: Optional[tuple],
+) -> None:
+    """
+    Worker loop: owns one shard's SystemState and answers commands
+    from the coordinator until told to close.
+    """
+
+    state = SystemState(products=products, rng=np.random.default_rng(seed))
+    writer = SnapshotWriter(checkpoint_path) if checkpoint_path else None
+
+    if retention is not None:
+        hot_days, archive_path, period = retention
+        state.history.set_retention(
+            hot_days,
+            HistoryArchive(archive_path, period=period),
+        )
+
+    try:
+        _shard_loop(conn, state, writer, top_k, config)
+    finally:
+        # Pool workers started by this shard (--workers) go with it
+        shutdown_pools(wait=True)
+
+
+def _shard_loop(
+    conn,
+    state: SystemState,
+    writer: Optional[SnapshotWriter],
+    top_k: int,
+    config: PipelineConfig,
+) -> None:
+
+    coordinator = os.getppid()
+
+    while True:
+        # Forked shards hold copies of each other's coordinator pipe
+        # ends, so a dead coordinator does not always mean EOF here;
+        # check on it while idle
+        while not conn.poll(_IDLE_CHECK_SECONDS):
+            if os.getppid() != coordinator:
+                return
+
+        try:
+            command, args = conn.recv()
+        except EOFError:
+            # The coordinator is gone; nobody is left to answer
+            return
+
+        try:
+            if command == "advance":
+                n, forecast_every, demand = args
+                advance_days(state, n, forecast_every, config, demand=demand)
+                result = _report(state, top_k)
+
+            elif command == "order":
+                product_id, quantity = args
+                place_order(state, product_id, quantity)
+                result = None
+
+            elif command == "insight":
+                result = state.insights.get(args[0])
+
+            elif command == "product":
+                result = state.products.get(args[0])
+
+            elif command == "checkpoint":
+                writer.write(state)
+                result = None
+
+            elif command == "close":
+                if state.history.archive is not None:
+                    state.history.archive.flush()
+                conn.send(("ok", None))
+                return
+
+            else:
+                raise ValueError(f"Unknown shard command: {command}")
+
+        except Exception:
+            conn.send(("error", traceback.format_exc()))
+            continue
+
+        conn.send(("ok", result))
+
+
+# ======================================================
+# Coordinator
+# ======================================================
+
+class ShardedSimulation:
+    """
+    Coordinator for a catalog split over n_shards worker processes.
+
+    After every advance(), `metrics` holds the merged totals and
+    `at_risk` the catalog-wide top_k most at-risk product ids.
+
+    With hot_days each shard bounds its history the same way as
+    HistoryStore.set_retention, archiving to its own subdirectory of
+    archive_path.
+    """
+
+    def __init__(
+        self,
+        products: Dict[str, ProductState],
+        n_shards: int,
+        seed: Optional[int] = None,
+        config: Optional[PipelineConfig] = None,
+        top_k: int = 10,
+        checkpoint_path: Optional[Union[str, Path]] = None,
+        hot_days: Optional[int] = None,
+        archive_path: Optional[Union[str, Path]] = None,
+        archive_period: int = 7,
+    ) -> None:
+        if n_shards < 1:
+            raise ValueError("n_shards must be at least 1")
+
+        if config is None:
+            config = PipelineConfig()
+
+        self.n_shards = n_shards
+        self.top_k = top_k
+        self.day = 0
+
+        parts: List[Dict[str, ProductState]] = [{} for _ in range(n_shards)]
+        for product_id, product in products.items():
+            parts[shard_of(product_id, n_shards)][product_id] = product
+        self.product_ids = [list(part) for part in parts]
+
+        self.metrics = Metrics()
+        self.at_risk: List[str] = []
+        self.reports: List[Optional[ShardReport]] = [None] * n_shards
+
+        ctx = get_context()
+        seeds = np.random.SeedSequence(seed).spawn(n_shards)
+
+        self._conns = []
+        self._procs = []
+        for i, part in enumerate(parts):
+            parent, child = ctx.Pipe()
+            path = (
+                str(Path(checkpoint_path) / f"shard-{i:03d}")
+                if checkpoint_path is not None
+                else None
+            )
+            retention = None
+            if hot_days is not None:
+                retention = (
+                    hot_days,
+                    (
+                        str(Path(archive_path) / f"shard-{i:03d}")
+                        if archive_path is not None
+                        else None
+                    ),
+                    archive_period,
+                )
+            proc = ctx.Process(
+                target=_serve_shard,
+                args=(
+                    child, part, seeds[i], config, top_k, path, retention,
+                ),
+                # Not daemonic, so shards can run their own fit pools
+                # (config.workers > 1); close() stops them explicitly
+                daemon=False,
+            )
+            proc.start()
+            child.close()
+            self._conns.append(parent)
+            self._procs.append(proc)
+
+    # --------------------------------------------------
+    # Messaging
+    # --------------------------------------------------
+    @staticmethod
+    def _receive(conn):
+        status, payload = conn.recv()
+        if status == "error":
+            raise RuntimeError(f"Shard failed:\n{payload}")
+        return payload
+
+    def _ask(self, shard: int, command: str, *args):
+        self._conns[shard].send((command, args))
+        return self._receive(self._conns[shard])
+
+    def _broadcast(self, command: str, per_shard_args: List[tuple]) -> list:
+        # Send to every shard first so they all work at the same time
+        for conn, args in zip(self._conns, per_shard_args):
+            conn.send((command, args))
+
+        # Drain every reply before raising, so the pipes stay in step
+        replies = [conn.recv() for conn in self._conns]
+        for status, payload in replies:
+            if status == "error":
+                raise RuntimeError(f"Shard failed:\n{payload}")
+        return [payload for _, payload in replies]
+
+    # --------------------------------------------------
+    # Simulation
+    # --------------------------------------------------
+    def advance(
+        self,
+        n: int = 1,
+        forecast_every: int = 1,
+        demand_feed: Optional[DemandFeed] = None,
+    ) -> None:
+        """
+        Advances every shard by n days in lockstep, then merges.
+        """
+
+        days = np.arange(self.day + 1, self.day + n + 1)
+        args = [
+            (
+                n,
+                forecast_every,
+                None if demand_feed is None
+                else demand_feed.demand_for_days(days, ids),
+            )
+            for ids in self.product_ids
+        ]
+
+        self.reports = self._broadcast("advance", args)
+        self.day = self.reports[0].day
+        self._merge()
+
+    def _merge(self) -> None:
+        metrics = Metrics()
+        for f in fields(Metrics):
+            if f.name != "forecast_errors":
+                setattr(
+                    metrics,
+                    f.name,
+                    sum(getattr(r.metrics, f.name) for r in self.reports),
+                )
+
+        # Daily MAE pooled over shards; every product is scored each
+        # day once it has a forecast, so product counts are the weights
+        counts = np.array([r.n_products for r in self.reports], dtype=float)
+        errors = [
+            r.metrics.forecast_errors for r in self.reports if r.n_products
+        ]
+        if errors:
+            days = min(len(e) for e in errors)
+            weights = counts[counts > 0] / counts.sum()
+            metrics.forecast_errors = (
+                np.array([e[:days] for e in errors]).T @ weights
+            ).tolist()
+
+        self.metrics = metrics
+
+        merged = RiskArrays(
+            product_ids=[
+                pid for r in self.reports for pid in r.at_risk.product_ids
+            ],
+            stockout_probability=np.concatenate(
+                [r.at_risk.stockout_probability for r in self.reports]
+            ),
+            expected_stockout_day=np.concatenate(
+                [r.at_risk.expected_stockout_day for r in self.reports]
+            ),
+        )
+        self.at_risk = top_k_at_risk(merged, self.top_k)
+
+    @property
+    def orders_recommended(self) -> int:
+        return sum(r.orders_recommended for r in self.reports if r)
+
+    # --------------------------------------------------
+    # Per-product access, routed to the owning shard
+    # --------------------------------------------------
+    def _owner(self, product_id: str) -> int:
+        return shard_of(product_id, self.n_shards)
+
+    def place_order(self, product_id: str, quantity: int) -> None:
+        self._ask(self._owner(product_id), "order", product_id, quantity)
+
+    def insight(self, product_id: str) -> Optional[InventoryInsight]:
+        return self._ask(self._owner(product_id), "insight", product_id)
+
+    def product(self, product_id: str) -> Optional[ProductState]:
+        return self._ask(self._owner(product_id), "product", product_id)
+
+    def checkpoint(self) -> None:
+        """
+        Each shard writes its own snapshot under checkpoint_path.
+        """
+        self._broadcast("checkpoint", [()] * self.n_shards)
+
+    def close(self) -> None:
+        """
+        Asks every shard to finish, then terminates any that do not
+        exit in time.
+        """
+        for conn, proc in zip(self._conns, self._procs):
+            if proc.is_alive():
+                try:
+                    conn.send(("close", ()))
+                    conn.recv()
+                except (EOFError, OSError):
+                    pass
+            conn.close()
+
+        for proc in self._procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join()
+
+    def __enter__(self) -> "ShardedSimulation":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def run_sharded(
+    products: Dict[str, ProductState],
+    days: int,
+    n_shards: int,
+    seed: Optional[int] = None,
+    config: Optional[PipelineConfig] = None,
+    forecast_every: int = 1,
+    demand_feed: Optional[DemandFeed] = None,
+    checkpoint_every: int = 0,
+    checkpoint_path: Optional[Union[str, Path]] = None,
+    hot_days: Optional[int] = None,
+    archive_path: Optional[Union[str, Path]] = None,
+    archive_period: int = 7,
+):
+    """
+    Sharded counterpart of simulation.runner.run_simulation; returns
+    the same RunReport with merged metrics.
+    """
+
+    from simulation.runner import RunReport
+
+    if checkpoint_every > 0 and checkpoint_path is None:
+        raise ValueError("checkpoint_every requires a checkpoint_path")
+
+    with ShardedSimulation(
+        products,
+        n_shards,
+        seed=seed,
+        config=config,
+        checkpoint_path=checkpoint_path if checkpoint_every > 0 else None,
+        hot_days=hot_days,
+        archive_path=archive_path,
+        archive_period=archive_period,
+    ) as sim:
+        start = time.perf_counter()
+
+        done = 0
+        while done < days:
+            step = min(forecast_every, days - done)
+            sim.advance(step, forecast_every=step, demand_feed=demand_feed)
+
+            if (
+                checkpoint_every > 0
+                and (done + step) // checkpoint_every
+                > done // checkpoint_every
+            ):
+                sim.checkpoint()
+
+            done += step
+
+        elapsed = time.perf_counter() - start
+
+        if checkpoint_every > 0 and days % checkpoint_every != 0:
+            sim.checkpoint()
+
+        rate = days / elapsed if elapsed > 0 else float("inf")
+
+        return RunReport(
+            days=days,
+            products=len(products),
+            elapsed_seconds=elapsed,
+            days_per_sec=rate,
+            products_per_sec=rate * len(products),
+            final_day=sim.day,
+            metrics=sim.metrics,
+        )
@@ -1,7 +1,10 @@
 # simulation/user_actions.py
 
-from state.system_state import SystemState
-from simulation.order_processor import place_order
+from typing import List, Mapping, Optional
+
+from state.system_state import SystemState, InventoryInsight
+from simulation.order_processor import place_order, place_orders
+from ai.recommender import InsightTable
 
 
 def user_restock(
@@ -21,3 +24,36 @@ def user_restock(
         return
 
     place_order(state, product_id, quantity)
+
+
+def accept_recommendations(
+    state: SystemState,
+    product_ids: Optional[List[str]] = None,
+) -> List[int]:
+    """
+    Human approval of the day's AI recommendations in one action.
+
+    Orders every recommended quantity in state.insights (or only
+    those for product_ids) through place_orders. Returns the ids of
+    the orders placed.
+    """
+
+    insights: Mapping[str, InventoryInsight] = state.insights
+
+    if product_ids is None and isinstance(insights, InsightTable):
+        ids = list(insights.product_ids)
+        quantities = insights.recommended_order_qty.tolist()
+        for pid, insight in insights.carried_over.items():
+            ids.append(pid)
+            quantities.append(insight.recommended_order_qty)
+        return place_orders(state, ids, quantities)
+
+    if product_ids is None:
+        product_ids = list(insights)
+
+    chosen = [pid for pid in product_ids if pid in insights]
+    return place_orders(
+        state,
+        chosen,
+        [insights[pid].recommended_order_qty for pid in chosen],
+    )
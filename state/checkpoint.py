@@ -0,0 +1,328 @@
+# state/checkpoint.py
+"""
+Binary snapshots of SystemState.
+
+A snapshot is a directory:
+
+    state.pkl                 everything except the histories
+                              (products, pending orders, metrics,
+                              forecasts, insights, fitted models, rng)
+    retention.json            history retention policy and the rows
+                              archived per product (only with one)
+    <metric>.products.json    product ids, in column order
+    <metric>.offsets.npy      start of each product's rows (CSR style)
+    <metric>.days.npy         all products' days, concatenated
+    <metric>.values.npy       all products' values, concatenated
+    <metric>.log              append-only records written after the
+                              base snapshot (see SnapshotWriter)
+
+The .npy columns are memory-mapped on load, so restoring a long
+history costs almost nothing until the data is touched.
+
+With a history retention policy a full snapshot holds only the
+in-memory (hot) rows; older rows live in the HistoryArchive, which is
+flushed with every snapshot. Append logs keep every row written since
+the last full snapshot, including rows archived since; on load the
+policy is restored from retention.json and those rows are dropped
+again without being re-archived. An in-memory archive (no path) is
+not saved.
+"""
+
+import json
+import pickle
+import shutil
+from dataclasses import fields
+from pathlib import Path
+from typing import Dict, List, Union
+
+import numpy as np
+
+from state.system_state import SystemState
+from state.history_store import HistoryStore, METRICS, value_dtype
+from state.history_archive import HistoryArchive
+
+
+_STATE_FILE = "state.pkl"
+_RETENTION_FILE = "retention.json"
+
+
+def _log_dtype(metric: str) -> np.dtype:
+    return np.dtype(
+        [("product", "<i4"), ("day", "<i8"), ("value", value_dtype(metric))]
+    )
+
+
+def _write_state(state: SystemState, directory: Path) -> None:
+    scalars = {
+        f.name: getattr(state, f.name)
+        for f in fields(state)
+        if f.name != "history"
+    }
+    tmp = directory / (_STATE_FILE + ".tmp")
+    with open(tmp, "wb") as fh:
+        pickle.dump(scalars, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(directory / _STATE_FILE)
+
+    if state.history.hot_days is not None:
+        _write_retention(state.history, directory)
+
+
+def _write_retention(history: HistoryStore, directory: Path) -> None:
+    archive = history.archive
+    retention = {
+        "hot_days": history.hot_days,
+        "archive_path": (
+            str(archive.path) if archive.path is not None else None
+        ),
+        "archive_period": archive.period,
+        # metric -> product -> [rows archived, rows in memory]
+        "rows": {
+            metric: {
+                pid: [
+                    history.dropped(metric, pid),
+                    history.length(metric, pid),
+                ]
+                for pid in history.product_ids(metric)
+            }
+            for metric in METRICS
+        },
+    }
+
+    tmp = directory / (_RETENTION_FILE + ".tmp")
+    with open(tmp, "w") as fh:
+        json.dump(retention, fh)
+    tmp.replace(directory / _RETENTION_FILE)
+
+
+def _restore_retention(history: HistoryStore, path: Path) -> None:
+    retention_path = path / _RETENTION_FILE
+    if not retention_path.exists():
+        return
+
+    with open(retention_path) as fh:
+        retention = json.load(fh)
+
+    for metric, rows in retention["rows"].items():
+        for pid, (dropped, kept) in rows.items():
+            history.restore_dropped(metric, pid, dropped, kept)
+
+    history.set_retention(
+        retention["hot_days"],
+        HistoryArchive(
+            retention["archive_path"],
+            period=retention["archive_period"],
+        ),
+    )
+
+
+def _write_columns(
+    history: HistoryStore,
+    metric: str,
+    directory: Path,
+) -> List[str]:
+
+    product_ids = history.product_ids(metric)
+    lengths = [history.length(metric, pid) for pid in product_ids]
+    offsets = np.zeros(len(product_ids) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    days = np.empty(offsets[-1], dtype=np.int64)
+    values = np.empty(offsets[-1], dtype=value_dtype(metric))
+    for i, pid in enumerate(product_ids):
+        d, v = history.series(metric, pid)
+        days[offsets[i]:offsets[i + 1]] = d
+        values[offsets[i]:offsets[i + 1]] = v
+
+    np.save(directory / f"{metric}.offsets.npy", offsets)
+    np.save(directory / f"{metric}.days.npy", days)
+    np.save(directory / f"{metric}.values.npy", values)
+    with open(directory / f"{metric}.products.json", "w") as fh:
+        json.dump(product_ids, fh)
+
+    return product_ids
+
+
+# ======================================================
+# Full snapshots
+# ======================================================
+
+def save_snapshot(state: SystemState, path: Union[str, Path]) -> None:
+    """
+    Writes a complete snapshot, replacing any existing one at `path`.
+    """
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+
+    _write_state(state, tmp)
+    for metric in METRICS:
+        _write_columns(state.history, metric, tmp)
+
+    if state.history.archive is not None:
+        state.history.archive.flush()
+
+    if path.exists():
+        shutil.rmtree(path)
+    tmp.rename(path)
+
+
+def load_snapshot(
+    path: Union[str, Path],
+    mmap: bool = True,
+) -> SystemState:
+    """
+    Restores a snapshot. With mmap=True the history columns stay on
+    disk and are paged in on access; each product's arrays are copied
+    only when the simulation first appends to them.
+    """
+
+    path = Path(path)
+
+    with open(path / _STATE_FILE, "rb") as fh:
+        scalars = pickle.load(fh)
+
+    history = HistoryStore()
+    mode = "r" if mmap else None
+
+    for metric in METRICS:
+        with open(path / f"{metric}.products.json") as fh:
+            product_ids = json.load(fh)
+
+        offsets = np.load(path / f"{metric}.offsets.npy")
+        days = np.load(path / f"{metric}.days.npy", mmap_mode=mode)
+        values = np.load(path / f"{metric}.values.npy", mmap_mode=mode)
+
+        for i, pid in enumerate(product_ids):
+            history.attach(
+                metric,
+                pid,
+                days[offsets[i]:offsets[i + 1]],
+                values[offsets[i]:offsets[i + 1]],
+            )
+
+        _replay_log(history, metric, path, product_ids)
+
+    _restore_retention(history, path)
+
+    return SystemState(history=history, **scalars)
+
+
+def _replay_log(
+    history: HistoryStore,
+    metric: str,
+    path: Path,
+    product_ids: List[str],
+) -> None:
+
+    log_path = path / f"{metric}.log"
+    if not log_path.exists():
+        return
+
+    records = np.fromfile(log_path, dtype=_log_dtype(metric))
+    if not len(records):
+        return
+
+    # Product ids first seen after the base snapshot
+    extra_path = path / f"{metric}.log-products.json"
+    if extra_path.exists():
+        with open(extra_path) as fh:
+            product_ids = product_ids + json.load(fh)
+
+    # Stable sort keeps each product's records in day order
+    order = np.argsort(records["product"], kind="stable")
+    records = records[order]
+    bounds = np.flatnonzero(np.diff(records["product"])) + 1
+
+    for chunk in np.split(records, bounds):
+        history.extend(
+            metric,
+            product_ids[chunk["product"][0]],
+            chunk["day"],
+            chunk["value"],
+        )
+
+
+# ======================================================
+# Append-only snapshots
+# ======================================================
+
+class SnapshotWriter:
+    """
+    Keeps a snapshot directory in sync with a running simulation.
+
+    The first write() is a full snapshot. Later writes rewrite only the
+    small state.pkl and append each product's new history rows to the
+    per-metric .log files, so the cost of a checkpoint is proportional
+    to the days since the previous one, not to the whole history.
+    compact() folds the logs back into the base columns.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._written: Dict[str, Dict[str, int]] = {}
+        self._product_index: Dict[str, Dict[str, int]] = {}
+
+    def write(self, state: SystemState) -> None:
+        if not self._written:
+            self.compact(state)
+            return
+
+        for metric in METRICS:
+            self._append_metric(state.history, metric)
+
+        _write_state(state, self.path)
+
+        if state.history.archive is not None:
+            state.history.archive.flush()
+
+    def compact(self, state: SystemState) -> None:
+        save_snapshot(state, self.path)
+
+        for metric in METRICS:
+            self._written[metric] = state.history.sizes(metric)
+            self._product_index[metric] = {
+                pid: i
+                for i, pid in enumerate(state.history.product_ids(metric))
+            }
+
+    def _append_metric(self, history: HistoryStore, metric: str) -> None:
+        written = self._written[metric]
+        index = self._product_index[metric]
+
+        chunks = []
+        new_products = []
+
+        for pid, size in history.sizes(metric).items():
+            start = written.get(pid, 0)
+            if size == start:
+                continue
+
+            if pid not in index:
+                index[pid] = len(index)
+                new_products.append(pid)
+
+            # Rows already moved to the archive are not logged again
+            begin = max(start - history.dropped(metric, pid), 0)
+            days, values = history.series(metric, pid)
+            chunk = np.empty(len(days) - begin, dtype=_log_dtype(metric))
+            chunk["product"] = index[pid]
+            chunk["day"] = days[begin:]
+            chunk["value"] = values[begin:]
+            chunks.append(chunk)
+            written[pid] = size
+
+        if new_products:
+            extra_path = self.path / f"{metric}.log-products.json"
+            known = []
+            if extra_path.exists():
+                with open(extra_path) as fh:
+                    known = json.load(fh)
+            with open(extra_path, "w") as fh:
+                json.dump(known + new_products, fh)
+
+        if chunks:
+            with open(self.path / f"{metric}.log", "ab") as fh:
+                np.concatenate(chunks).tofile(fh)
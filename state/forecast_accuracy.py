@@ -0,0 +1,190 @@
+# state/forecast_accuracy.py
+"""
+Online forecast-accuracy accumulators.
+
+Each realized (forecast, actual) pair is folded into running sums per
+product and globally, so MAE, RMSE, MAPE, sMAPE, bias and interval
+coverage are available at any time without rescanning history.
+
+With decay < 1 the sums are exponentially weighted: every update
+first multiplies the product's (and the global) accumulators by
+`decay`, so an observation k updates old carries weight decay**k.
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+
+# Running sums, one row each
+_WEIGHT = 0       # sum of weights
+_ABS = 1          # |error|
+_SQ = 2           # error ** 2
+_ERR = 3          # forecast - actual (positive = over-forecast)
+_APE = 4          # |error| / actual, actual > 0 only
+_APE_WEIGHT = 5
+_SAPE = 6         # 2 |error| / (|forecast| + |actual|)
+_SAPE_WEIGHT = 7
+_COVERED = 8      # actual inside [lower, upper]
+_BAND_WEIGHT = 9
+
+_N_SUMS = 10
+
+
+class ForecastAccuracy:
+    """
+    Per-product and global accuracy, updated in O(1) per observation.
+    """
+
+    def __init__(self, decay: float = 1.0) -> None:
+        if not 0.0 < decay <= 1.0:
+            raise ValueError("decay must be in (0, 1]")
+
+        self.decay = decay
+
+        self._index: Dict[str, int] = {}
+        self._sums = np.zeros((_N_SUMS, 0))
+        self._global = np.zeros(_N_SUMS)
+
+    # --------------------------------------------------
+    # Updates
+    # --------------------------------------------------
+    def _rows(self, product_ids: Sequence[str]) -> np.ndarray:
+        for pid in product_ids:
+            if pid not in self._index:
+                self._index[pid] = len(self._index)
+
+        if len(self._index) > self._sums.shape[1]:
+            grown = np.zeros(
+                (_N_SUMS, max(len(self._index), 2 * self._sums.shape[1]))
+            )
+            grown[:, :self._sums.shape[1]] = self._sums
+            self._sums = grown
+
+        return np.array([self._index[pid] for pid in product_ids], dtype=np.int64)
+
+    def update(
+        self,
+        product_ids: Sequence[str],
+        forecast: np.ndarray,
+        actual: np.ndarray,
+        lower: Optional[np.ndarray] = None,
+        upper: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Folds one day's observations in, one per product (product_ids
+        must be distinct). NaN bounds mean the forecast had no
+        interval and are left out of coverage.
+        """
+
+        if len(product_ids) == 0:
+            return
+
+        rows = self._rows(product_ids)
+        forecast = np.asarray(forecast, dtype=float)
+        actual = np.asarray(actual, dtype=float)
+
+        obs = self._observations(forecast, actual, lower, upper)
+
+        if self.decay < 1.0:
+            self._sums[:, rows] *= self.decay
+            self._global *= self.decay
+
+        self._sums[:, rows] += obs
+        self._global += obs.sum(axis=1)
+
+    @staticmethod
+    def _observations(forecast, actual, lower, upper) -> np.ndarray:
+        error = forecast - actual
+        abs_error = np.abs(error)
+
+        obs = np.zeros((_N_SUMS, len(actual)))
+        obs[_WEIGHT] = 1.0
+        obs[_ABS] = abs_error
+        obs[_SQ] = error ** 2
+        obs[_ERR] = error
+
+        positive = actual > 0
+        obs[_APE] = np.divide(
+            abs_error, actual, out=np.zeros_like(actual), where=positive
+        )
+        obs[_APE_WEIGHT] = positive
+
+        scale = np.abs(forecast) + np.abs(actual)
+        nonzero = scale > 0
+        obs[_SAPE] = np.divide(
+            2 * abs_error, scale, out=np.zeros_like(scale), where=nonzero
+        )
+        obs[_SAPE_WEIGHT] = nonzero
+
+        if lower is not None and upper is not None:
+            lower = np.asarray(lower, dtype=float)
+            upper = np.asarray(upper, dtype=float)
+            banded = ~(np.isnan(lower) | np.isnan(upper))
+            with np.errstate(invalid="ignore"):
+                inside = (actual >= lower) & (actual <= upper)
+            obs[_COVERED] = inside & banded
+            obs[_BAND_WEIGHT] = banded
+
+        return obs
+
+    # --------------------------------------------------
+    # Queries
+    # --------------------------------------------------
+    @staticmethod
+    def _summary(sums: np.ndarray) -> Dict[str, float]:
+        def ratio(num: int, den: int) -> float:
+            return float(sums[num] / sums[den]) if sums[den] > 0 else float("nan")
+
+        mse = ratio(_SQ, _WEIGHT)
+        return {
+            "count": float(sums[_WEIGHT]),
+            "mae": ratio(_ABS, _WEIGHT),
+            "rmse": float(np.sqrt(mse)),
+            "bias": ratio(_ERR, _WEIGHT),
+            "mape": ratio(_APE, _APE_WEIGHT),
+            "smape": ratio(_SAPE, _SAPE_WEIGHT),
+            "coverage": ratio(_COVERED, _BAND_WEIGHT),
+        }
+
+    def product(self, product_id: str) -> Dict[str, float]:
+        """
+        Accuracy of one product; NaN for metrics with no observations.
+        """
+        row = self._index.get(product_id)
+        if row is None:
+            return self._summary(np.zeros(_N_SUMS))
+        return self._summary(self._sums[:, row])
+
+    def overall(self) -> Dict[str, float]:
+        """
+        Accuracy pooled over every product and day.
+        """
+        return self._summary(self._global)
+
+    def table(self) -> Dict[str, np.ndarray]:
+        """
+        Every product's metrics as aligned columns, for ranking or
+        model selection over the whole catalog.
+        """
+
+        sums = self._sums[:, :len(self._index)]
+
+        def ratio(num: int, den: int) -> np.ndarray:
+            return np.divide(
+                sums[num],
+                sums[den],
+                out=np.full(sums.shape[1], np.nan),
+                where=sums[den] > 0,
+            )
+
+        return {
+            "product_id": np.array(list(self._index), dtype=object),
+            "count": sums[_WEIGHT].copy(),
+            "mae": ratio(_ABS, _WEIGHT),
+            "rmse": np.sqrt(ratio(_SQ, _WEIGHT)),
+            "bias": ratio(_ERR, _WEIGHT),
+            "mape": ratio(_APE, _APE_WEIGHT),
+            "smape": ratio(_SAPE, _SAPE_WEIGHT),
+            "coverage": ratio(_COVERED, _BAND_WEIGHT),
+        }
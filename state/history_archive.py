@@ -0,0 +1,209 @@
+# state/history_archive.py
+"""
+Aggregated archive of history rows that left the in-memory window.
+
+Rows are summarized per product and per period of `period` days
+(7 = weekly, 30 = monthly): sum, count, min and max of the values.
+With a directory the aggregates are appended to one flat binary file
+per metric:
+
+    <metric>.archive                 fixed-size records (ARCHIVE_DTYPE)
+    <metric>.archive-products.json   product index -> product_id
+
+Without a directory they are kept in memory, which is still a fraction
+of the raw rows.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+
+# Period p covers days p * period + 1 ... (p + 1) * period
+ARCHIVE_DTYPE = np.dtype([
+    ("product", np.int32),
+    ("period", np.int64),
+    ("sum", np.float64),
+    ("count", np.int32),
+    ("min", np.float64),
+    ("max", np.float64),
+])
+
+# Buffered records are written out once this many are pending
+_FLUSH_EVERY = 100_000
+
+
+def aggregate_rows(
+    days: np.ndarray,
+    values: np.ndarray,
+    period: int,
+) -> np.ndarray:
+    """
+    Per-period aggregates of one product's rows (days ascending).
+    The "product" field is left at 0.
+    """
+
+    periods = (days - 1) // period
+    starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+
+    out = np.zeros(len(starts), dtype=ARCHIVE_DTYPE)
+    out["period"] = periods[starts]
+    out["sum"] = np.add.reduceat(values, starts)
+    out["count"] = np.diff(np.r_[starts, len(values)])
+    out["min"] = np.minimum.reduceat(values, starts)
+    out["max"] = np.maximum.reduceat(values, starts)
+    return out
+
+
+class HistoryArchive:
+    """
+    Append-only store of per-period aggregates, one stream per metric.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        period: int = 7,
+    ) -> None:
+        if period < 1:
+            raise ValueError("period must be at least 1 day")
+
+        self.path = Path(path) if path is not None else None
+        self.period = period
+
+        self._products: Dict[str, List[str]] = {}
+        self._index: Dict[str, Dict[str, int]] = {}
+        self._buffer: Dict[str, List[np.ndarray]] = {}
+        self._pending: Dict[str, int] = {}
+        self._saved_products: Dict[str, int] = {}
+
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    # --------------------------------------------------
+    # Writes
+    # --------------------------------------------------
+    def add(
+        self,
+        metric: str,
+        product_id: str,
+        days: np.ndarray,
+        values: np.ndarray,
+    ) -> None:
+        """
+        Aggregates and archives rows dropped from memory.
+        """
+
+        if len(days) == 0:
+            return
+
+        index = self._product_index(metric)
+        if product_id not in index:
+            index[product_id] = len(index)
+            self._products[metric].append(product_id)
+
+        records = aggregate_rows(days, values, self.period)
+        records["product"] = index[product_id]
+
+        self._buffer.setdefault(metric, []).append(records)
+        self._pending[metric] = self._pending.get(metric, 0) + len(records)
+
+        if self.path is not None and self._pending[metric] >= _FLUSH_EVERY:
+            self.flush(metric)
+
+    def _product_index(self, metric: str) -> Dict[str, int]:
+        if metric not in self._index:
+            self._products[metric] = self._load_products(metric)
+            self._index[metric] = {
+                pid: i for i, pid in enumerate(self._products[metric])
+            }
+            self._saved_products[metric] = len(self._products[metric])
+        return self._index[metric]
+
+    def flush(self, metric: Optional[str] = None) -> None:
+        """
+        Writes buffered aggregates to disk (no-op without a path).
+        """
+
+        if self.path is None:
+            return
+
+        for m in [metric] if metric is not None else list(self._buffer):
+            chunks = self._buffer.get(m)
+            if not chunks:
+                continue
+
+            with open(self.path / f"{m}.archive", "ab") as fh:
+                np.concatenate(chunks).tofile(fh)
+
+            if len(self._products[m]) > self._saved_products[m]:
+                with open(self._products_path(m), "w") as fh:
+                    json.dump(self._products[m], fh)
+                self._saved_products[m] = len(self._products[m])
+
+            self._buffer[m] = []
+            self._pending[m] = 0
+
+    # --------------------------------------------------
+    # Reads
+    # --------------------------------------------------
+    def records(self, metric: str) -> np.ndarray:
+        """
+        Every archived aggregate of a metric, all products.
+        """
+
+        parts = []
+        if self.path is not None:
+            file = self.path / f"{metric}.archive"
+            if file.exists() and file.stat().st_size:
+                parts.append(np.fromfile(file, dtype=ARCHIVE_DTYPE))
+        parts.extend(self._buffer.get(metric, []))
+
+        if not parts:
+            return np.zeros(0, dtype=ARCHIVE_DTYPE)
+        return np.concatenate(parts)
+
+    def aggregates(self, metric: str, product_id: str) -> np.ndarray:
+        """
+        One product's aggregates in period order. Periods that were
+        archived in pieces are merged.
+        """
+
+        index = self._product_index(metric)
+        if product_id not in index:
+            return np.zeros(0, dtype=ARCHIVE_DTYPE)
+
+        rows = self.records(metric)
+        rows = rows[rows["product"] == index[product_id]]
+        rows = rows[np.argsort(rows["period"], kind="stable")]
+
+        periods, starts = np.unique(rows["period"], return_index=True)
+        if len(periods) == len(rows):
+            return rows
+
+        merged = np.zeros(len(periods), dtype=ARCHIVE_DTYPE)
+        merged["product"] = index[product_id]
+        merged["period"] = periods
+        merged["sum"] = np.add.reduceat(rows["sum"], starts)
+        merged["count"] = np.add.reduceat(rows["count"], starts)
+        merged["min"] = np.minimum.reduceat(rows["min"], starts)
+        merged["max"] = np.maximum.reduceat(rows["max"], starts)
+        return merged
+
+    def product_ids(self, metric: str) -> List[str]:
+        self._product_index(metric)
+        return list(self._products[metric])
+
+    # --------------------------------------------------
+    # Files
+    # --------------------------------------------------
+    def _products_path(self, metric: str) -> Path:
+        return self.path / f"{metric}.archive-products.json"
+
+    def _load_products(self, metric: str) -> List[str]:
+        if self.path is None or not self._products_path(metric).exists():
+            return []
+        with open(self._products_path(metric)) as fh:
+            return json.load(fh)
@@ -0,0 +1,376 @@
+# state/history_store.py
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from state.history_archive import HistoryArchive
+
+
+# ======================================================
+# Metrics tracked per product
+# ======================================================
+
+DEMAND = "demand"
+SALES = "sales"
+FORECAST = "forecast"
+
+# metric -> (value dtype, record class name, record value attribute)
+_METRICS = {
+    DEMAND: (np.int64, "DemandRecord", "demand"),
+    SALES: (np.int64, "SalesRecord", "units_sold"),
+    FORECAST: (np.float64, "DailyForecastRecord", "forecast_for_day"),
+}
+
+METRICS = tuple(_METRICS)
+
+_INITIAL_CAPACITY = 64
+
+
+def value_dtype(metric: str) -> np.dtype:
+    return np.dtype(_METRICS[metric][0])
+
+
+# ======================================================
+# Growable column
+# ======================================================
+
+class _Series:
+    """
+    One product's history for one metric.
+
+    Days and values live in two NumPy arrays that double in capacity
+    when full, so appends are amortized O(1) and tail reads are views.
+    """
+
+    __slots__ = ("days", "values", "size", "dropped")
+
+    def __init__(self, dtype) -> None:
+        self.days = np.empty(_INITIAL_CAPACITY, dtype=np.int64)
+        self.values = np.empty(_INITIAL_CAPACITY, dtype=dtype)
+        self.size = 0
+
+        # Rows removed from the front by the retention policy
+        self.dropped = 0
+
+    def append(self, day: int, value) -> None:
+        if self.size == len(self.values):
+            self._grow(self.size + 1)
+        self.days[self.size] = day
+        self.values[self.size] = value
+        self.size += 1
+
+    def extend(self, days: np.ndarray, values: np.ndarray) -> None:
+        n = len(values)
+        if self.size + n > len(self.values):
+            self._grow(self.size + n)
+        self.days[self.size:self.size + n] = days
+        self.values[self.size:self.size + n] = values
+        self.size += n
+
+    def _grow(self, needed: int) -> None:
+        capacity = max(needed, 2 * len(self.values), _INITIAL_CAPACITY)
+
+        days = np.empty(capacity, dtype=self.days.dtype)
+        days[:self.size] = self.days[:self.size]
+        values = np.empty(capacity, dtype=self.values.dtype)
+        values[:self.size] = self.values[:self.size]
+
+        self.days = days
+        self.values = values
+
+    def drop_front(self, n: int) -> None:
+        """
+        Forgets the oldest n rows, moving the rest into fresh buffers
+        (the old ones may be read-only memory maps).
+        """
+        keep = self.size - n
+        capacity = max(2 * keep, _INITIAL_CAPACITY)
+
+        days = np.empty(capacity, dtype=self.days.dtype)
+        days[:keep] = self.days[n:self.size]
+        values = np.empty(capacity, dtype=self.values.dtype)
+        values[:keep] = self.values[n:self.size]
+
+        self.days = days
+        self.values = values
+        self.size = keep
+        self.dropped += n
+
+
+# ======================================================
+# History store
+# ======================================================
+
+class HistoryStore:
+    """
+    Per-product, per-metric columnar history.
+
+    Replaces the flat lists of DemandRecord / SalesRecord /
+    DailyForecastRecord: appends are O(1) and reading the last
+    `window` values of one product is O(window), independent of
+    how many products or days have been recorded.
+
+    By default everything is kept. set_retention() bounds memory to a
+    hot window of recent days per product; older rows are rolled up
+    into a HistoryArchive.
+    """
+
+    def __init__(self) -> None:
+        self._series: Dict[str, Dict[str, _Series]] = {
+            metric: {} for metric in _METRICS
+        }
+        self._counts: Dict[str, int] = {metric: 0 for metric in _METRICS}
+
+        self.hot_days: Optional[int] = None
+        self.archive: Optional[HistoryArchive] = None
+        self._slack = 0
+
+    # --------------------------------------------------
+    # Retention
+    # --------------------------------------------------
+    def set_retention(
+        self,
+        hot_days: int,
+        archive: Optional[HistoryArchive] = None,
+    ) -> None:
+        """
+        Keeps at least the last `hot_days` days of every series in
+        memory. Whole archive periods that fall before the hot window
+        are aggregated into `archive` (in-memory weekly if None) and
+        dropped. Trimming happens in batches as series grow, so a
+        series holds at most hot_days plus about half that again.
+
+        hot_days must cover every reader's window, e.g. the forecast
+        window and the dashboard's chart range.
+        """
+
+        if hot_days < 1:
+            raise ValueError("hot_days must be at least 1")
+
+        self.hot_days = hot_days
+        self.archive = archive if archive is not None else HistoryArchive()
+        self._slack = max(self.archive.period, hot_days // 2)
+
+        for metric, by_product in self._series.items():
+            for product_id, series in by_product.items():
+                self._retain(metric, product_id, series)
+
+    def _retain(self, metric: str, product_id: str, series: _Series) -> None:
+        if series.size == 0:
+            return
+
+        period = self.archive.period
+        first_hot = int(series.days[series.size - 1]) - self.hot_days + 1
+
+        # Only complete periods leave memory
+        cutoff = ((first_hot - 1) // period) * period + 1
+        n = int(np.searchsorted(series.days[:series.size], cutoff))
+        if n == 0:
+            return
+
+        self.archive.add(
+            metric,
+            product_id,
+            series.days[:n],
+            series.values[:n],
+        )
+        series.drop_front(n)
+        self._counts[metric] -= n
+
+    # --------------------------------------------------
+    # Writes
+    # --------------------------------------------------
+    def append(self, metric: str, product_id: str, day: int, value) -> None:
+        series = self._get_or_create(metric, product_id)
+        series.append(day, value)
+        self._counts[metric] += 1
+
+        if self.hot_days is not None and (
+            series.size >= self.hot_days + self._slack
+        ):
+            self._retain(metric, product_id, series)
+
+    def extend(
+        self,
+        metric: str,
+        product_id: str,
+        days: np.ndarray,
+        values: np.ndarray,
+    ) -> None:
+        series = self._get_or_create(metric, product_id)
+        series.extend(days, values)
+        self._counts[metric] += len(values)
+
+        if self.hot_days is not None and (
+            series.size >= self.hot_days + self._slack
+        ):
+            self._retain(metric, product_id, series)
+
+    def _get_or_create(self, metric: str, product_id: str) -> _Series:
+        by_product = self._series[metric]
+        series = by_product.get(product_id)
+        if series is None:
+            series = _Series(_METRICS[metric][0])
+            by_product[product_id] = series
+        return series
+
+    # --------------------------------------------------
+    # Reads
+    # --------------------------------------------------
+    def tail(self, metric: str, product_id: str, window: int) -> np.ndarray:
+        """
+        Last `window` values for a product (read-only view).
+        """
+        series = self._series[metric].get(product_id)
+        if series is None:
+            return np.empty(0, dtype=_METRICS[metric][0])
+        start = max(series.size - window, 0)
+        view = series.values[start:series.size]
+        view.flags.writeable = False
+        return view
+
+    def series(
+        self,
+        metric: str,
+        product_id: str,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Full (days, values) columns for a product (read-only views).
+        """
+        series = self._series[metric].get(product_id)
+        if series is None:
+            return (
+                np.empty(0, dtype=np.int64),
+                np.empty(0, dtype=_METRICS[metric][0]),
+            )
+        days = series.days[:series.size]
+        values = series.values[:series.size]
+        days.flags.writeable = False
+        values.flags.writeable = False
+        return days, values
+
+    def length(self, metric: str, product_id: str) -> int:
+        series = self._series[metric].get(product_id)
+        return 0 if series is None else series.size
+
+    def dropped(self, metric: str, product_id: str) -> int:
+        """
+        Rows of a product moved to the archive so far.
+        """
+        series = self._series[metric].get(product_id)
+        return 0 if series is None else series.dropped
+
+    def product_ids(self, metric: str) -> List[str]:
+        return list(self._series[metric])
+
+    def count(self, metric: str) -> int:
+        return self._counts[metric]
+
+    def sizes(self, metric: str) -> Dict[str, int]:
+        """
+        Rows ever recorded per product, including archived ones.
+        """
+        return {
+            product_id: series.dropped + series.size
+            for product_id, series in self._series[metric].items()
+        }
+
+    def attach(
+        self,
+        metric: str,
+        product_id: str,
+        days: np.ndarray,
+        values: np.ndarray,
+    ) -> None:
+        """
+        Installs existing arrays (e.g. memory-mapped slices) as a
+        product's history without copying. The first append copies
+        them into a growable buffer.
+        """
+        previous = self._series[metric].get(product_id)
+        if previous is not None:
+            self._counts[metric] -= previous.size
+
+        series = _Series.__new__(_Series)
+        series.days = days
+        series.values = values
+        series.size = len(values)
+        series.dropped = 0
+        self._series[metric][product_id] = series
+        self._counts[metric] += series.size
+
+    def restore_dropped(
+        self,
+        metric: str,
+        product_id: str,
+        dropped: int,
+        kept: int,
+    ) -> None:
+        """
+        Re-applies retention to a product loaded from a snapshot: keeps
+        only its last `kept` rows and records `dropped` rows as already
+        archived. The rows removed here are not archived again.
+        """
+        series = self._series[metric].get(product_id)
+        if series is None:
+            return
+
+        n = series.size - kept
+        if n > 0:
+            series.drop_front(n)
+            self._counts[metric] -= n
+        series.dropped = dropped
+
+    def view(self, metric: str) -> "HistoryView":
+        return HistoryView(self, metric)
+
+
+# ======================================================
+# Record-based compatibility view
+# ======================================================
+
+class HistoryView:
+    """
+    List-like facade over one metric of a HistoryStore.
+
+    Appending a record writes it into the columnar store; iterating
+    materializes records on the fly, grouped by product and in day
+    order within each product.
+    """
+
+    def __init__(self, store: HistoryStore, metric: str) -> None:
+        # Imported here: state.system_state imports this module
+        import state.system_state as records
+
+        self.store = store
+        self.metric = metric
+        _, record_name, self._attr = _METRICS[metric]
+        self._record_cls = getattr(records, record_name)
+
+    def append(self, record) -> None:
+        self.store.append(
+            self.metric,
+            record.product_id,
+            record.day,
+            getattr(record, self._attr),
+        )
+
+    def extend(self, records) -> None:
+        for record in records:
+            self.append(record)
+
+    def tail(self, product_id: str, window: int) -> np.ndarray:
+        return self.store.tail(self.metric, product_id, window)
+
+    def __len__(self) -> int:
+        return self.store.count(self.metric)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator:
+        for product_id in self.store.product_ids(self.metric):
+            days, values = self.store.series(self.metric, product_id)
+            for day, value in zip(days.tolist(), values.tolist()):
+                yield self._record_cls(day, product_id, value)
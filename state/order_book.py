@@ -0,0 +1,115 @@
+# state/order_book.py
+
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+
+class PendingOrderBook:
+    """
+    Open purchase orders, bucketed by arrival day.
+
+    - Orders due on a given day are found and removed in O(1)
+    - Order ids come from a monotonic counter and are never reused
+    - In-transit quantity per product is kept up to date on every
+      add / delivery, so it never needs a scan. Orders ship when they
+      are placed, so this is also the quantity on order.
+    """
+
+    def __init__(self) -> None:
+        self._by_day: Dict[int, list] = {}
+        self._in_transit: Dict[str, int] = {}
+        self._size = 0
+        self._next_id = 1
+
+    # --------------------------------------------------
+    # Writes
+    # --------------------------------------------------
+    def next_order_id(self) -> int:
+        order_id = self._next_id
+        self._next_id += 1
+        return order_id
+
+    def add(self, order) -> None:
+        self._by_day.setdefault(order.arrival_day, []).append(order)
+        self._in_transit[order.product_id] = (
+            self._in_transit.get(order.product_id, 0) + order.quantity
+        )
+        self._size += 1
+
+        # Keep the allocator ahead of ids assigned elsewhere
+        if order.order_id >= self._next_id:
+            self._next_id = order.order_id + 1
+
+    # list-style alias
+    append = add
+
+    def reserve_ids(self, n: int) -> range:
+        """
+        n consecutive fresh order ids.
+        """
+        ids = range(self._next_id, self._next_id + n)
+        self._next_id += n
+        return ids
+
+    def add_many(self, orders: list) -> None:
+        """
+        Adds a batch of orders. Orders must carry ids from
+        next_order_id() / reserve_ids().
+        """
+        by_day = self._by_day
+        in_transit = self._in_transit
+        for order in orders:
+            by_day.setdefault(order.arrival_day, []).append(order)
+            in_transit[order.product_id] = (
+                in_transit.get(order.product_id, 0) + order.quantity
+            )
+        self._size += len(orders)
+
+    def pop_due(self, day: int) -> list:
+        """
+        Removes and returns every order arriving on `day`.
+        """
+        due = self._by_day.pop(day, [])
+        for order in due:
+            remaining = self._in_transit[order.product_id] - order.quantity
+            if remaining:
+                self._in_transit[order.product_id] = remaining
+            else:
+                del self._in_transit[order.product_id]
+        self._size -= len(due)
+        return due
+
+    # --------------------------------------------------
+    # Reads
+    # --------------------------------------------------
+    def in_transit(self, product_id: str) -> int:
+        return self._in_transit.get(product_id, 0)
+
+    def in_transit_totals(self) -> Dict[str, int]:
+        return dict(self._in_transit)
+
+    def in_transit_array(self, product_ids: List[str]) -> np.ndarray:
+        """
+        In-transit quantity of each product in product_ids, as one
+        array (0 where nothing is on the way).
+        """
+        get = self._in_transit.get
+        return np.fromiter(
+            (get(pid, 0) for pid in product_ids),
+            dtype=np.int64,
+            count=len(product_ids),
+        )
+
+    def due_on(self, day: int) -> List:
+        return list(self._by_day.get(day, ()))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def __iter__(self) -> Iterator:
+        for day in sorted(self._by_day):
+            yield from self._by_day[day]
@@ -1,6 +1,18 @@
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 
+import numpy as np
+
+from state.history_store import (
+    HistoryStore,
+    HistoryView,
+    DEMAND,
+    SALES,
+    FORECAST,
+)
+from state.order_book import PendingOrderBook
+from state.forecast_accuracy import ForecastAccuracy
+
 @dataclass
 class ProductState:
     product_id: str
@@ -23,6 +35,9 @@ class ProductState:
     holding_cost: float
     stockout_cost: float
 
+    # Product group for hierarchical forecasting (ai.hierarchical)
+    category: Optional[str] = None
+
 @dataclass
 class DailyForecastRecord:
     day: int
@@ -55,6 +70,18 @@ class DemandForecast:
     confidence_bands: dict | None = None
 
 
+@dataclass
+class FittedModelState:
+    """
+    Last fitted ARIMA + GARCH parameters for one product, reused as
+    start values (or applied as-is) by the incremental forecaster.
+    """
+    arima_params: list[float]
+    garch_params: list[float]
+    fitted_on_day: int
+    residual_scale: float
+
+
 @dataclass
 class InventoryInsight:
     product_id: str
@@ -86,14 +113,33 @@ class SystemState:
     day: int = 0
 
     products: Dict[str, ProductState] = field(default_factory=dict)
-    pending_orders: List[PendingOrder] = field(default_factory=list)
-    sales_history: List[SalesRecord] = field(default_factory=list)
+    pending_orders: PendingOrderBook = field(default_factory=PendingOrderBook)
     forecasts: Dict[str, DemandForecast] = field(default_factory=dict)
     insights: Dict[str, InventoryInsight] = field(default_factory=dict)
     metrics: Metrics = field(default_factory=Metrics)
-    forecast_history: list[DailyForecastRecord] = field(default_factory=list)
-    demand_history: list[DemandRecord] = field(default_factory=list)
+    fitted_models: Dict[str, FittedModelState] = field(default_factory=dict)
+
+    # Category and total forecasts of a hierarchical run (ai.hierarchical)
+    group_forecasts: Dict[str, DemandForecast] = field(default_factory=dict)
+
+    # Running forecast error per product, scored as demand is realized
+    accuracy: ForecastAccuracy = field(default_factory=ForecastAccuracy)
+
+    # Seedable source of simulated demand
+    rng: np.random.Generator = field(default_factory=np.random.default_rng)
 
+    # Columnar demand / sales / forecast history, one array per product
+    history: HistoryStore = field(default_factory=HistoryStore)
 
+    # Record-based views kept for callers written against the old lists
+    @property
+    def demand_history(self) -> HistoryView:
+        return self.history.view(DEMAND)
 
+    @property
+    def sales_history(self) -> HistoryView:
+        return self.history.view(SALES)
 
+    @property
+    def forecast_history(self) -> HistoryView:
+        return self.history.view(FORECAST)